@@ -0,0 +1,63 @@
+import re
+
+# OCR annotation wrappers, e.g. "[UNDERLINED: some text]"
+ANNOTATION_RE = re.compile(r"\[(UNDERLINED|CIRCLE|BOX|CROSSED|DIAGRAM):\s*([^\[\]]*)\]")
+# Annotations whose content was struck out by the writer
+DROPPED_ANNOTATIONS = {"CROSSED"}
+
+# "perspec-  \n-tives" -> "perspectives"
+HYPHEN_BREAK_RE = re.compile(r"(\w)-[ \t ]*\n[ \t ]*-?(\w)")
+BULLET_RE = re.compile(r"^[ \t]*[→⇒↳↓•]+[ \t]*", re.MULTILINE)
+INLINE_ARROW_RE = re.compile(r"[ \t]*[→⇒↳↓][ \t]*")
+SPACES_RE = re.compile(r"[ \t  ]+")
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def _words(text):
+    return " ".join(re.findall(r"\w+", text.casefold()))
+
+
+def _repeats_neighbour(text, match):
+    # True when the annotation fills its line and its words appear in the previous or next non-blank line
+    start, end = match.span()
+    line_start = text.rfind("\n", 0, start) + 1
+    line_end = text.find("\n", end)
+    line_end = len(text) if line_end == -1 else line_end
+    if text[line_start:start].strip() or text[end:line_end].strip():
+        return False
+    words = _words(match.group(2))
+    previous = text[:line_start].rstrip().rsplit("\n", 1)[-1]
+    following = text[line_end:].lstrip().split("\n", 1)[0]
+    for line in (previous, following):
+        line_words = _words(ANNOTATION_RE.sub(r" \2 ", line))
+        if words and f" {words} " in f" {line_words} ":
+            return True
+    return False
+
+
+def clean_answer(text):
+    """
+    Shrink an OCR-transcribed answer before fact extraction.
+    Rejoins hyphenated line breaks, drops struck-out annotations and annotations on a line of their own
+    that repeat the neighbouring line, unwraps the rest, turns arrow bullets into dashes and normalizes whitespace.
+    """
+    if not text:
+        return text
+
+    text = HYPHEN_BREAK_RE.sub(r"\1\2", text)
+
+    def _replace(match):
+        kind, inner = match.group(1), match.group(2).strip()
+        if kind in DROPPED_ANNOTATIONS or not inner:
+            return ""
+        if _repeats_neighbour(text, match):
+            return ""
+        return inner
+
+    text = ANNOTATION_RE.sub(_replace, text)
+    text = BULLET_RE.sub("- ", text)
+    text = INLINE_ARROW_RE.sub(" - ", text)
+    text = SPACES_RE.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    text = BLANK_LINES_RE.sub("\n\n", text)
+    return text.strip()
@@ -0,0 +1,68 @@
+"""
+Extraction input size per answer in qa_pairs.json before and after clean_answer.
+
+Reports characters, tokens and LangExtract chunks (max_char_buffer=1000, one model
+prompt each) per answer. With --live it also times extract_facts on the raw and the
+cleaned answers (extraction cache disabled).
+
+Run from the project root:
+    python -m benchmarks.bench_answer_cleaning [--live]
+"""
+import argparse
+import json
+import math
+import time
+
+from answer_cleaning import clean_answer
+from validation_and_reasoning import count_tokens
+
+LANGEXTRACT_CHUNK_CHARS = 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--file", default="qa_pairs.json")
+    parser.add_argument("--live", action="store_true", help="time extract_facts on raw vs cleaned answers")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        answers = [qa.get("answer", "") for qa in json.load(f).get("qa_pairs", [])]
+
+    if args.live:
+        import fact_extraction
+        fact_extraction.set_extraction_cache(None)
+        fact_extraction.EXTRACTION_CLEAN_ANSWERS = False
+
+    totals = {"chars": [0, 0], "tokens": [0, 0], "chunks": [0, 0], "seconds": [0.0, 0.0]}
+    header = f"{'pair':>4} {'chars':>13} {'tokens':>11} {'chunks':>7}"
+    print(header + (f" {'extract s':>13}" if args.live else ""))
+    for idx, raw in enumerate(answers, start=1):
+        cleaned = clean_answer(raw)
+        row = {
+            "chars": [len(raw), len(cleaned)],
+            "tokens": [count_tokens(raw), count_tokens(cleaned)],
+            "chunks": [math.ceil(len(raw) / LANGEXTRACT_CHUNK_CHARS), math.ceil(len(cleaned) / LANGEXTRACT_CHUNK_CHARS)],
+        }
+        line = (f"{idx:>4} {row['chars'][0]:>6}/{row['chars'][1]:<6} {row['tokens'][0]:>5}/{row['tokens'][1]:<5} "
+                f"{row['chunks'][0]:>3}/{row['chunks'][1]:<3}")
+        if args.live:
+            timings = []
+            for text in (raw, cleaned):
+                start = time.perf_counter()
+                fact_extraction.extract_facts(text)
+                timings.append(time.perf_counter() - start)
+            row["seconds"] = timings
+            line += f" {timings[0]:>6.1f}/{timings[1]:<6.1f}"
+        print(line)
+        for name, (before, after) in row.items():
+            totals[name][0] += before
+            totals[name][1] += after
+
+    print()
+    for name, (before, after) in totals.items():
+        if before:
+            print(f"{name:>7}: {before:.0f} -> {after:.0f} ({1 - after / before:.1%} less)")
+
+
+if __name__ == "__main__":
+    main()
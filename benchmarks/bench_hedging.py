@@ -0,0 +1,83 @@
+"""
+Tail latency of google_search_async with and without hedging, against a local Tavily stand-in
+where some requests are slow and some fail with HTTP 500.
+
+Searches are not retried (TAVILY_MAX_RETRIES=0) so each query is one hedged attempt; queries
+that still fail are counted separately and left out of the latency percentiles.
+
+Run from the project root:
+    python -m benchmarks.bench_hedging [--queries 400] [--slow-rate 0.03] [--error-rate 0.05]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+
+from evidence import web_search
+from evidence.hedging import Hedger
+from evidence.rate_limit import RetryBudget
+from evidence.stub_server import StubConfig, start_stub_server
+
+
+async def _time_queries(n, label):
+    latencies, failed = [], 0
+    async with web_search.build_async_search_client() as client:
+        for i in range(n):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):  # "Error: ..." lines for failed searches
+                results = await web_search.google_search_async(f"{label} query {i}", n_results=5, client=client)
+            if results:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                failed += 1
+    return latencies, failed
+
+
+def _report(label, latencies, failed):
+    latencies = sorted(latencies)
+    def pct(q):
+        return latencies[int(q * (len(latencies) - 1))]
+    print(f"{label:<10} p50={pct(0.5):8.1f} ms  p95={pct(0.95):8.1f} ms  p99={pct(0.99):8.1f} ms  "
+          f"({len(latencies)} ok, {failed} failed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--latency", default="uniform:20:60", help="stub latency distribution (ms)")
+    parser.add_argument("--slow-rate", type=float, default=0.03)
+    parser.add_argument("--slow-ms", type=float, default=1000.0)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--hedge-rate", type=float, default=web_search.SEARCH_HEDGE_RATE * 2)
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency, args.slow_rate, args.slow_ms, args.error_rate)
+    server = start_stub_server(config=config)
+    web_search.TAVILY_SEARCH_URL = f"http://127.0.0.1:{server.server_address[1]}/search"
+    os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+    web_search.set_evidence_cache(None)  # measure the network path only
+    web_search.search_rate_limiter.rate = 0  # no client-side throttling
+    web_search.SEARCH_MAX_RETRIES = 0
+
+    try:
+        web_search.SEARCH_HEDGE_ENABLED = False
+        before = asyncio.run(_time_queries(args.queries, "plain"))
+        web_search.SEARCH_HEDGE_ENABLED = True
+        hedger = Hedger(RetryBudget(ratio=args.hedge_rate, min_tokens=1), default_delay=args.slow_ms / 1000)
+        web_search.search_hedger = hedger
+        after = asyncio.run(_time_queries(args.queries, "hedged"))
+    finally:
+        server.shutdown()
+
+    print(f"{args.queries} queries, {args.slow_rate:.0%} taking {args.slow_ms:g} ms, {args.error_rate:.0%} HTTP 500")
+    _report("plain", *before)
+    _report("hedged", *after)
+    stats = hedger.stats()
+    print(f"Hedged {stats['hedged']} searches ({stats['hedged'] / args.queries:.1%}), hedge won {stats['hedge_wins']}, "
+          f"final delay {stats['delay'] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
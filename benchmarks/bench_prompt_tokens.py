@@ -0,0 +1,102 @@
+"""
+Validation prompt size per QA pair in qa_pairs.json: the old Python-list-repr
+prompt vs the compact serializer.
+
+Offline by default: facts are the answer's non-trivial lines and evidence comes
+from the evidence cache when present, otherwise 5 Tavily-sized stand-in snippets.
+Use --live to extract facts with Gemini and search with Tavily instead.
+
+Run from the project root:
+    python -m benchmarks.bench_prompt_tokens [--live]
+"""
+import argparse
+import json
+import re
+
+import validation_and_reasoning
+from validation_and_reasoning import build_validation_prompt, count_tokens, _evidence_fields
+
+STANDIN_SNIPPET_CHARS = 900
+
+
+def legacy_prompt(facts_evidence_dict):
+    # The prompt as it was built before serialize_facts_evidence: a list of
+    # ruled blocks interpolated with its repr.
+    facts_text = []
+    for idx, (fact, evidence_list) in enumerate(facts_evidence_dict.items(), 1):
+        fact_block = f"\n{'='*80}\nFACT #{idx}: {fact}\n{'='*80}\n"
+        evidence_blocks = []
+        for i, ev in enumerate(evidence_list, 1):
+            title, snippet, url = _evidence_fields(ev)
+            evidence_blocks.append(
+                f"  EVIDENCE {idx}.{i}:\n"
+                f"    Title: {title}\n"
+                f"    Snippet: {snippet}\n"
+                f"    URL: {url}\n"
+            )
+        fact_block += "\n".join(evidence_blocks)
+        facts_text.append(fact_block)
+    template = build_validation_prompt({})
+    return template.replace("Here are the facts and evidence:\n", f"Here are the facts and evidence:\n{facts_text}", 1)
+
+
+def offline_facts(answer):
+    facts = []
+    for line in answer.splitlines():
+        line = re.sub(r"\[[A-Z]+:\s*|\]", "", line).strip(" -→•*")
+        if len(line.split()) >= 5:
+            facts.append(line)
+    return facts
+
+
+def offline_evidence(fact, n_results=5):
+    from evidence.web_search import get_evidence_cache, _search_key
+    cache = get_evidence_cache()
+    cached = cache.get(_search_key(fact, n_results)) if cache is not None else None
+    if cached is not None:
+        return cached
+    body = (f"{fact}.\n\n" * (STANDIN_SNIPPET_CHARS // (len(fact) + 3) + 1))[:STANDIN_SNIPPET_CHARS]
+    return [
+        {"title": f"{fact[:60]} - Source {i}", "snippet": body, "url": f"https://example.org/{i}/{abs(hash(fact)) % 10**8}"}
+        for i in range(1, n_results + 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--file", default="qa_pairs.json")
+    parser.add_argument("--live", action="store_true", help="use extract_facts and google_search")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        qa_pairs = json.load(f).get("qa_pairs", [])
+
+    if args.live:
+        from fact_extraction import extract_facts
+        from evidence.web_search import google_search
+
+    total_before = total_after = 0
+    print(f"{'pair':>4} {'facts':>5} {'before':>8} {'after':>8} {'saved':>6}")
+    for idx, qa in enumerate(qa_pairs, start=1):
+        answer = qa.get("answer", "")
+        if args.live:
+            facts = extract_facts(answer)
+            evidence_dict = {fact: google_search(fact, n_results=5) for fact in facts}
+        else:
+            evidence_dict = {fact: offline_evidence(fact) for fact in offline_facts(answer)}
+        if not evidence_dict:
+            continue
+        before = count_tokens(legacy_prompt(evidence_dict))
+        after = count_tokens(build_validation_prompt(evidence_dict))
+        total_before += before
+        total_after += after
+        print(f"{idx:>4} {len(evidence_dict):>5} {before:>8} {after:>8} {1 - after / before:>6.1%}")
+
+    if total_before:
+        print(f"{'all':>4} {'':>5} {total_before:>8} {total_after:>8} {1 - total_after / total_before:>6.1%}")
+    if validation_and_reasoning._encoding is False:
+        print("Note: tiktoken vocabulary unavailable; token counts are ~4 chars/token estimates.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Validation prompt tokens and verdicts with and without evidence reranking, on a recorded run.
+
+Facts and search results are replayed from a cassette recorded with `python main.py --record
+cassettes/run.sqlite`. Each pair's prompt is measured with all N_RESULTS items per fact and
+with the reranked top-k. With --validate both
+versions are validated and verdict changes are listed; add --auto once (with Azure
+credentials) to record those validations into the cassette, after which the comparison
+replays offline.
+
+Run from the project root:
+    python -m benchmarks.bench_rerank [--cassette cassettes/run.sqlite] [--validate [--auto]]
+"""
+import argparse
+import contextlib
+import io
+import json
+
+import fact_extraction
+import validation_and_reasoning
+from cassette import CASSETTE_PATH, Cassette, CassetteMiss, set_cassette
+from evidence import web_search
+from evidence.rerank import RERANK_MIN_SCORE, RERANK_TOP_K, rerank_evidence
+from validation_and_reasoning import build_validation_prompt, count_tokens
+
+N_RESULTS = 5
+
+
+def _replay_facts(answers):
+    try:
+        return fact_extraction.extract_facts_batch(answers)
+    except CassetteMiss:
+        pass
+    facts_by_pair = []
+    for answer in answers:
+        try:
+            facts_by_pair.append(fact_extraction.extract_facts(answer))
+        except CassetteMiss:
+            facts_by_pair.append(None)
+    return facts_by_pair
+
+
+def _replay_evidence(facts):
+    evidence_dict = {}
+    for fact in facts:
+        for n_results in (N_RESULTS, 2):  # 2 = main's downgraded searches
+            try:
+                evidence = web_search.google_search(fact, n_results=n_results)
+            except CassetteMiss:
+                continue
+            if evidence:
+                evidence_dict[fact] = evidence
+            break
+    return evidence_dict
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--file", default="qa_pairs.json")
+    parser.add_argument("--cassette", default=CASSETTE_PATH)
+    parser.add_argument("--top-k", type=int, default=RERANK_TOP_K)
+    parser.add_argument("--min-score", type=float, default=RERANK_MIN_SCORE)
+    parser.add_argument("--validate", action="store_true", help="compare verdicts with and without reranking")
+    parser.add_argument("--auto", action="store_true", help="call (and record) services for unrecorded calls")
+    args = parser.parse_args()
+
+    set_cassette(Cassette(args.cassette, "auto" if args.auto else "replay", latency_scale=0))
+    fact_extraction.set_extraction_cache(None)
+    web_search.set_evidence_cache(None)
+    validation_and_reasoning.set_verdict_cache(None)
+    validation_and_reasoning.SEMANTIC_CACHE_ENABLED = False
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        qa_pairs = json.load(f).get("qa_pairs", [])
+
+    totals = {"before": 0, "after": 0, "items_before": 0, "items_after": 0}
+    compared = changed = unavailable = 0
+    changes = []
+    print(f"{'pair':>4} {'facts':>5} {'items':>9} {'tokens':>13} {'saved':>6}")
+    for idx, facts in enumerate(_replay_facts([qa.get("answer", "") for qa in qa_pairs]), start=1):
+        if not facts:
+            continue
+        full = _replay_evidence(facts)
+        if not full:
+            continue
+        reranked = {fact: rerank_evidence(fact, ev, args.top_k, args.min_score) for fact, ev in full.items()}
+        row = {
+            "before": count_tokens(build_validation_prompt(full)),
+            "after": count_tokens(build_validation_prompt(reranked)),
+            "items_before": sum(map(len, full.values())),
+            "items_after": sum(map(len, reranked.values())),
+        }
+        for name, value in row.items():
+            totals[name] += value
+        print(f"{idx:>4} {len(full):>5} {row['items_before']:>4}/{row['items_after']:<4} "
+              f"{row['before']:>6}/{row['after']:<6} {1 - row['after'] / row['before']:>6.1%}")
+
+        if args.validate:
+            with contextlib.redirect_stdout(io.StringIO()):
+                before = validation_and_reasoning.validate_facts_batch(full)
+                after = validation_and_reasoning.validate_facts_batch(reranked)
+            for fact in full:
+                old, new = before.get(fact, {}).get("verdict"), after.get(fact, {}).get("verdict")
+                if "Error" in (old, new) or None in (old, new):
+                    unavailable += 1
+                    continue
+                compared += 1
+                if old != new:
+                    changed += 1
+                    changes.append((idx, fact, old, new))
+
+    if not totals["before"]:
+        print(f"No recorded extractions/searches found in {args.cassette}")
+        return
+    print(f"\n{'all':>4} items {totals['items_before']} -> {totals['items_after']}, prompt tokens "
+          f"{totals['before']} -> {totals['after']} ({1 - totals['after'] / totals['before']:.1%} less)")
+    if args.validate:
+        print(f"Verdicts: {changed} of {compared} changed; {unavailable} facts without both verdicts")
+        for idx, fact, old, new in changes:
+            print(f"  pair {idx}: {old} -> {new}: {fact}")
+    if validation_and_reasoning._encoding is False:
+        print("Note: tiktoken vocabulary unavailable; token counts are ~4 chars/token estimates.")
+
+
+if __name__ == "__main__":
+    main()
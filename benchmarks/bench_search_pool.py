@@ -0,0 +1,65 @@
+"""
+Per-query latency of google_search against a local Tavily stand-in:
+a fresh connection per call (old behaviour) vs the pooled keep-alive session.
+
+Run from the project root:
+    python -m benchmarks.bench_search_pool --queries 200
+"""
+import argparse
+import os
+import statistics
+import time
+
+import requests
+
+from evidence import web_search
+from evidence.stub_server import StubConfig, start_stub_server
+
+
+def _time_queries(n, session_factory):
+    latencies = []
+    for i in range(n):
+        session = session_factory()
+        start = time.perf_counter()
+        web_search.google_search(f"benchmark query {i}", n_results=5, session=session)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if session is not web_search.get_search_session():
+            session.close()
+    return latencies
+
+
+def _report(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(f"{label:<28} mean={statistics.mean(latencies):7.3f} ms  "
+          f"p50={statistics.median(latencies):7.3f} ms  p95={p95:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    server = start_stub_server(config=StubConfig(latency="fixed:0"))
+    web_search.TAVILY_SEARCH_URL = f"http://127.0.0.1:{server.server_address[1]}/search"
+    os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+    web_search.set_evidence_cache(None)  # measure the network path only
+    web_search.search_rate_limiter.rate = 0  # no client-side throttling
+
+    try:
+        # Before: one throwaway session (and TCP connection) per query, like a bare requests.post
+        before = _time_queries(args.queries, requests.Session)
+        # After: the shared pooled session; connections stay warm between queries
+        web_search.get_search_session()
+        after = _time_queries(args.queries, web_search.get_search_session)
+    finally:
+        server.shutdown()
+
+    print(f"{args.queries} queries against {web_search.TAVILY_SEARCH_URL}")
+    _report("fresh connection per query", before)
+    _report("pooled keep-alive session", after)
+    print("Note: plain HTTP on loopback; real Tavily calls also pay a TLS handshake per fresh connection.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Lookup latency and paraphrase hits of SemanticVerdictCache at tens of thousands of entries.
+
+Fills the cache with synthetic facts built from the words of qa_pairs.json, then
+times lookups and checks that paraphrases hit while changed entities, numbers or
+comparatives miss.
+
+Run from the project root:
+    python -m benchmarks.bench_semantic_cache [--entries 20000]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from answer_cleaning import clean_answer
+from semantic_cache import SemanticVerdictCache
+
+# (cached fact, query, expected to reuse the verdict)
+PROBES = [
+    ("Kerala literacy rate is over 96%", "Kerala has literacy above 96 percent", True),
+    ("The Forest Rights Act was enacted in 2006.", "Forest Rights Act enacted in the year 2006", True),
+    ("India's GDP growth is 6.8% per IMF", "India GDP growth 6.8 percent according to IMF", True),
+    ("Kerala literacy rate is over 96%", "Kerala literacy rate is below 96%", False),
+    ("Kerala literacy rate is over 96%", "Tamil Nadu literacy rate is over 96%", False),
+    ("India's GDP growth is 6.8% per IMF", "India's GDP growth is 6.3% per IMF", False),
+    ("India exports rice to China", "China exports rice to India", False),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--file", default="qa_pairs.json")
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        words = " ".join(clean_answer(qa.get("answer", "")) for qa in json.load(f).get("qa_pairs", [])).split()
+
+    rng = random.Random(0)
+    cache = SemanticVerdictCache()
+    start = time.perf_counter()
+    for i in range(args.entries):
+        cache.add(" ".join(rng.sample(words, 10)) + f" in {1900 + i % 120}", {"verdict": "Supported"})
+    add_seconds = time.perf_counter() - start
+
+    for cached_fact, _, _ in PROBES:
+        cache.add(cached_fact, {"verdict": "Supported", "reasoning": cached_fact, "supporting_urls": []})
+    ok = 0
+    for cached_fact, query, expected in PROBES:
+        hit = cache.lookup(query)
+        reused = hit is not None and hit["reasoning"] == cached_fact
+        ok += reused == expected
+        print(f"{'hit ' if hit else 'miss'} ({'ok' if reused == expected else 'WRONG'})  {query}")
+
+    queries = [probe[1] for probe in PROBES]
+    start = time.perf_counter()
+    for i in range(args.lookups):
+        cache.lookup(queries[i % len(queries)])
+    lookup_seconds = time.perf_counter() - start
+
+    path = os.path.join(tempfile.mkdtemp(), "semantic.npz")
+    cache.save(path)
+    start = time.perf_counter()
+    SemanticVerdictCache(path)
+    load_seconds = time.perf_counter() - start
+
+    print(f"\n{ok}/{len(PROBES)} probes as expected")
+    print(f"{len(cache)} entries: add {add_seconds / args.entries * 1e6:.0f} us, "
+          f"lookup {lookup_seconds / args.lookups * 1e3:.3f} ms, "
+          f"load {load_seconds:.2f} s, file {os.path.getsize(path) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
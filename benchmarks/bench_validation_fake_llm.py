@@ -0,0 +1,80 @@
+"""
+Throughput of validate_facts_batch around the LLM call, using FakeChatModel instead of Azure.
+
+Facts and evidence are built offline from qa_pairs.json (as in bench_prompt_tokens). Every
+QA pair is validated with the fake model, optionally with latency and malformed, truncated or
+incomplete responses, to time prompt building, parsing, citation mapping and the retry path.
+Verdict caches are disabled.
+
+Run from the project root:
+    python -m benchmarks.bench_validation_fake_llm [--latency 0.5] [--malformed-rate 0.1] [--concurrent]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+from collections import Counter
+
+import validation_and_reasoning
+from fake_llm import FakeChatModel
+from benchmarks.bench_prompt_tokens import offline_facts, offline_evidence
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--file", default="qa_pairs.json")
+    parser.add_argument("--repeat", type=int, default=5, help="validate every QA pair this many times")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per LLM call")
+    parser.add_argument("--seconds-per-token", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--truncated-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="per-fact chance the model omits it")
+    parser.add_argument("--concurrent", action="store_true", help="validate all pairs at once with the async API")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        qa_pairs = json.load(f).get("qa_pairs", [])
+    batches = []
+    for qa in qa_pairs:
+        evidence_dict = {fact: offline_evidence(fact) for fact in offline_facts(qa.get("answer", ""))}
+        if evidence_dict:
+            batches.append(evidence_dict)
+    batches = batches * args.repeat
+
+    model = FakeChatModel(
+        latency=args.latency,
+        seconds_per_token=args.seconds_per_token,
+        malformed_rate=args.malformed_rate,
+        truncated_rate=args.truncated_rate,
+        drop_rate=args.drop_rate,
+    )
+    validation_and_reasoning.set_llm(model)
+    validation_and_reasoning.set_verdict_cache(None)
+    validation_and_reasoning.SEMANTIC_CACHE_ENABLED = False
+
+    start = time.perf_counter()
+    chatter = io.StringIO()
+    with contextlib.redirect_stdout(chatter):  # parser/retry messages
+        if args.concurrent:
+            async def _run():
+                return await asyncio.gather(*(validation_and_reasoning.validate_facts_batch_async(b) for b in batches))
+            results = asyncio.run(_run())
+        else:
+            results = [validation_and_reasoning.validate_facts_batch(b) for b in batches]
+    elapsed = time.perf_counter() - start
+
+    n_facts = sum(len(b) for b in batches)
+    verdicts = Counter(r["verdict"] for batch in results for r in batch.values())
+    print(f"{len(batches)} batches, {n_facts} facts in {elapsed:.2f} s: "
+          f"{n_facts / elapsed:.0f} facts/s, {elapsed / len(batches) * 1000:.1f} ms/batch")
+    retry_rounds = chatter.getvalue().count("Re-validating")
+    print(f"LLM calls: {model.stats['calls']} ({retry_rounds} retry rounds), "
+          f"{model.stats['output_tokens']} output tokens, {model.stats['malformed']} malformed, "
+          f"{model.stats['truncated']} truncated, {model.stats['dropped_facts']} facts dropped")
+    print("Verdicts: " + ", ".join(f"{v}={n}" for v, n in verdicts.most_common()))
+
+
+if __name__ == "__main__":
+    main()
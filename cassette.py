@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from evidence.cache import EvidenceCache
+
+# "off", "record" (call the real service and store each response), "replay" (serve stored responses only)
+# or "auto" (replay recorded calls, record the rest)
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", os.path.join("cassettes", "run.sqlite"))
+# Replayed calls sleep for their recorded latency times this factor; 0 replays instantly
+CASSETTE_LATENCY_SCALE = float(os.getenv("CASSETTE_LATENCY_SCALE", "1.0"))
+
+_FOREVER = 100 * 365 * 24 * 3600  # cassette entries never expire
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+class CassetteMiss(LookupError):
+    """
+    Raised in replay mode for a call that was not recorded.
+    """
+
+
+class ReplayOnlyModel:
+    """
+    Stand-in chat model for replay mode, so no credentials are needed; every call must come from the cassette.
+    """
+
+    def __init__(self, deployment_name):
+        self.deployment_name = deployment_name
+
+    def invoke(self, prompt):
+        raise CassetteMiss(f"Unrecorded LLM call to {self.deployment_name} in replay mode")
+
+    async def ainvoke(self, prompt):
+        return self.invoke(prompt)
+
+
+def make_cassette_key(kind, key_parts):
+    """
+    SHA-256 over the call kind and its JSON-serializable identifying parts.
+    """
+    raw = json.dumps([kind, key_parts], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """
+    Record/replay store for external calls (Tavily searches, LangExtract extractions, Azure validations).
+    Responses are kept in an SQLite table indexed by call key, together with the latency of the
+    original call, so a recorded run can be replayed offline instantly or with (scaled) real timing.
+    Responses must be JSON-serializable.
+    """
+
+    def __init__(self, path=CASSETTE_PATH, mode="replay", latency_scale=CASSETTE_LATENCY_SCALE):
+        if mode not in ("record", "replay", "auto"):
+            raise ValueError(f"Invalid cassette mode: {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.store = EvidenceCache(path, ttl=_FOREVER, max_entries=0, table="cassette")
+        self.recorded = 0
+        self.replayed = 0
+        self.missed = 0
+
+    def has(self, kind, key_parts):
+        """
+        Whether a call was recorded under (kind, key_parts).
+        """
+        return self.store.get(make_cassette_key(kind, key_parts)) is not None
+
+    def add(self, kind, key_parts, response, latency):
+        """
+        Store a response obtained outside call(), e.g. one part of a batched call, unless in replay mode.
+        """
+        if self.mode == "replay":
+            return
+        self.store.set(make_cassette_key(kind, key_parts), {"kind": kind, "latency": latency, "response": response})
+        self.recorded += 1
+
+    def _replay(self, kind, key):
+        # Returns (response, delay), or None in auto mode for an unrecorded call
+        entry = self.store.get(key)
+        if entry is None:
+            if self.mode == "auto":
+                return None
+            self.missed += 1
+            raise CassetteMiss(f"No recorded {kind} call in {self.path}")
+        self.replayed += 1
+        return entry["response"], entry["latency"] * self.latency_scale
+
+    def call(self, kind, key_parts, func):
+        """
+        Record func() under (kind, key_parts), or return its recorded response.
+        """
+        key = make_cassette_key(kind, key_parts)
+        replayed = self._replay(kind, key) if self.mode != "record" else None
+        if replayed is not None:
+            response, delay = replayed
+            if delay > 0:
+                time.sleep(delay)
+            return response
+        start = time.perf_counter()
+        response = func()
+        self.store.set(key, {"kind": kind, "latency": time.perf_counter() - start, "response": response})
+        self.recorded += 1
+        return response
+
+    async def call_async(self, kind, key_parts, coro_func):
+        """
+        Asyncio variant of call; coro_func() returns an awaitable.
+        """
+        key = make_cassette_key(kind, key_parts)
+        replayed = self._replay(kind, key) if self.mode != "record" else None
+        if replayed is not None:
+            response, delay = replayed
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return response
+        start = time.perf_counter()
+        response = await coro_func()
+        self.store.set(key, {"kind": kind, "latency": time.perf_counter() - start, "response": response})
+        self.recorded += 1
+        return response
+
+    def stats(self):
+        return {"recorded": self.recorded, "replayed": self.replayed, "missed": self.missed, "entries": len(self.store)}
+
+
+def get_cassette():
+    """
+    Return the module-level cassette, opening it on first use.
+    Returns None when CASSETTE_MODE is "off".
+    """
+    global _cassette
+    if _cassette is None and CASSETTE_MODE != "off":
+        with _cassette_lock:
+            if _cassette is None:
+                _cassette = Cassette(CASSETTE_PATH, CASSETTE_MODE, CASSETTE_LATENCY_SCALE)
+    return _cassette
+
+
+def set_cassette(cassette):
+    """
+    Replace the module-level cassette; pass None to call services directly.
+    Returns the previous cassette, which is not closed.
+    """
+    global _cassette, CASSETTE_MODE
+    with _cassette_lock:
+        previous, _cassette = _cassette, cassette
+        CASSETTE_MODE = cassette.mode if cassette is not None else "off"
+    return previous
+
+
+def call(kind, key_parts, func):
+    """
+    Run func() through the active cassette, or directly when none is active.
+    """
+    cassette = get_cassette()
+    return func() if cassette is None else cassette.call(kind, key_parts, func)
+
+
+async def call_async(kind, key_parts, coro_func):
+    cassette = get_cassette()
+    if cassette is None:
+        return await coro_func()
+    return await cassette.call_async(kind, key_parts, coro_func)
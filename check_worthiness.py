@@ -0,0 +1,204 @@
+import os
+import re
+import math
+import zlib
+import threading
+
+# Facts scoring below this are skipped (or downgraded) before search and validation
+CHECK_WORTHINESS_THRESHOLD = float(os.getenv("CHECK_WORTHINESS_THRESHOLD", "0.35"))
+
+HASH_BUCKETS = 2 ** 12
+
+MONTHS = (
+    "january|february|march|april|may|june|july|august|september|october|november|december|"
+    "jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec"
+)
+NUMBER_RE = re.compile(r"\d")
+PERCENT_RE = re.compile(r"\d\s*(%|per\s*cent|percent)", re.IGNORECASE)
+YEAR_RE = re.compile(r"\b(1[6-9]\d\d|20\d\d)s?\b")
+DATE_RE = re.compile(rf"\b({MONTHS})\b\.?\s*\d{{0,4}}", re.IGNORECASE)
+QUANTITY_RE = re.compile(r"\b\d[\d,.]*\s*(lakh|crore|million|billion|km|sq|hectare|mw|gw|tonnes?|kg|°c)\b", re.IGNORECASE)
+ARTICLE_RE = re.compile(r"\b(article|section|schedule|amendment)\s+\d+", re.IGNORECASE)
+ACRONYM_RE = re.compile(r"\b[A-Z]{2,}\b")
+PROPER_NOUN_RE = re.compile(r"(?<![.!?]\s)(?<!^)\b[A-Z][a-z]+")
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+OFFICIAL_SOURCES = (
+    "according to", "report", "survey", "census", "ministry", "government", "govt", "imf", "world bank",
+    "rbi", "niti aayog", "un ", "unesco", "who ", "supreme court", "high court", "act", "constitution",
+    "scheme", "mission", "committee", "commission", "policy", "index", "data", "estimated", "launched",
+    "established", "declared", "notified", "ranked", "published",
+)
+SUBJECTIVE_MARKERS = (
+    "should", "must", "need to", "needs to", "crucial", "important", "essential", "hallmark", "beautiful",
+    "rich", "richness", "valuable", "vital", "key to", "way forward", "harmony", "hence", "thus", "etc",
+    "conclusion", "can be", "could", "may be", "might", "believe", "feel", "best", "great",
+)
+
+# Small hand-labelled seed set (1 = verifiable, 0 = opinion/rhetoric) used to fit the linear model
+SEED_EXAMPLES = [
+    ("India's GDP growth rate in 2023 is projected at 6.8% by the IMF.", 1),
+    ("The literacy rate in Kerala is the highest in India, at over 96%.", 1),
+    ("Census 2011 recorded India's population at 121 crore.", 1),
+    ("The Forest Rights Act was enacted in 2006.", 1),
+    ("Article 21 of the Constitution guarantees the right to life and personal liberty.", 1),
+    ("The Supreme Court struck down Section 66A of the IT Act in 2015.", 1),
+    ("AMRUT was launched by the Ministry of Housing and Urban Affairs in June 2015.", 1),
+    ("Swachh Bharat Abhiyan was launched on 2 October 2014.", 1),
+    ("Banni grasslands are located in the Kutch district of Gujarat.", 1),
+    ("India has 75 Ramsar sites as of 2022.", 1),
+    ("The Fifth Schedule deals with the administration of Scheduled Areas.", 1),
+    ("NITI Aayog replaced the Planning Commission in 2015.", 1),
+    ("The RBI raised the repo rate to 6.5% in February 2023.", 1),
+    ("Warli painting originates from the Sahyadri range in Maharashtra.", 1),
+    ("Gond art is associated with tribes of Madhya Pradesh.", 1),
+    ("The 73rd Amendment gave constitutional status to Panchayati Raj institutions.", 1),
+    ("India's forest cover is 21.71% of its geographical area according to the ISFR 2021.", 1),
+    ("The National Food Security Act covers about two-thirds of the population.", 1),
+    ("Chandrayaan-3 landed near the lunar south pole in August 2023.", 1),
+    ("The PESA Act extends Panchayati Raj to Fifth Schedule areas.", 1),
+    ("Mahatma Gandhi launched the Dandi March in 1930.", 1),
+    ("The Indian Ocean Dipole affects monsoon rainfall over India.", 1),
+    ("Urban heat islands can be 2 to 5 degrees Celsius warmer than surrounding rural areas.", 1),
+    ("Lakshadweep has the highest share of Scheduled Tribe population among Union Territories.", 1),
+    ("The Wetlands (Conservation and Management) Rules were notified in 2017.", 1),
+    ("Kerala was declared the first fully literate state in 1991.", 1),
+    ("UNESCO inscribed Santiniketan on the World Heritage List in 2023.", 1),
+    ("The Mahila Samakhya programme was started in 1988.", 1),
+    ("Women constitute about 48% of India's population.", 1),
+    ("The Sixth Schedule applies to tribal areas of Assam, Meghalaya, Tripura and Mizoram.", 1),
+    ("Diversity is the hallmark of Indian tribal art.", 0),
+    ("Preserving tribal art is crucial to conserve the cultural heritage of the country.", 0),
+    ("Water bodies are critical ecosystems and necessary steps should be taken for their conservation.", 0),
+    ("A holistic approach is the need of the hour.", 0),
+    ("Tribal art provides valuable insights into cultural values.", 0),
+    ("Globalisation is bringing homogeneity and a threat to diversity.", 0),
+    ("We must ensure inclusive growth for all sections of society.", 0),
+    ("Education is the key to empowerment.", 0),
+    ("The way forward lies in community participation.", 0),
+    ("Art reflects the soul of a civilisation.", 0),
+    ("Sustainable lifestyles are important for the future.", 0),
+    ("Thus, a multi-pronged strategy is required.", 0),
+    ("Hence, cooperative federalism should be strengthened.", 0),
+    ("Urban planning needs to be more people-centric.", 0),
+    ("Women and men together singing and dancing shows inclusivity.", 0),
+    ("Tribal communities live in harmony with nature.", 0),
+    ("Good governance can transform society.", 0),
+    ("Technology can be a great enabler.", 0),
+    ("Respect for gender and inclusivity is seen in tribal life.", 0),
+    ("Communities should be sensitised about conservation.", 0),
+    ("It is essential to strike a balance between development and environment.", 0),
+    ("Climate change is the greatest challenge of our times.", 0),
+    ("India is a land of unity in diversity.", 0),
+    ("Loss of culture due to sanskritisation etc.", 0),
+    ("Challenges remain in implementation.", 0),
+    ("Awareness generation is the need of the hour.", 0),
+    ("Society must change its mindset towards women.", 0),
+    ("Cities are engines of growth.", 0),
+    ("Traditional knowledge is a valuable resource.", 0),
+    ("Policy measures should be people-centric and inclusive.", 0),
+]
+
+
+def _features(fact):
+    """
+    Sparse feature dict for a fact: rule-based verifiability signals plus hashed unigrams.
+    """
+    text = str(fact)
+    lower = text.casefold()
+    words = WORD_RE.findall(lower)
+    features = {
+        "bias": 1.0,
+        "has_number": float(bool(NUMBER_RE.search(text))),
+        "has_percent": float(bool(PERCENT_RE.search(text))),
+        "has_year": float(bool(YEAR_RE.search(text))),
+        "has_date": float(bool(DATE_RE.search(text))),
+        "has_quantity": float(bool(QUANTITY_RE.search(text))),
+        "has_article": float(bool(ARTICLE_RE.search(text))),
+        "acronyms": min(len(ACRONYM_RE.findall(text)), 3) / 3,
+        "proper_nouns": min(len(PROPER_NOUN_RE.findall(text)), 4) / 4,
+        "official_source": float(any(term in f" {lower} " for term in OFFICIAL_SOURCES)),
+        "subjective": float(any(re.search(rf"\b{re.escape(term)}\b", lower) for term in SUBJECTIVE_MARKERS)),
+        "short": float(len(words) < 6),
+    }
+    for word in words:
+        bucket = f"w{zlib.crc32(word.encode('utf-8')) % HASH_BUCKETS}"
+        features[bucket] = features.get(bucket, 0.0) + 1.0 / math.sqrt(len(words))
+    return features
+
+
+class CheckWorthinessModel:
+    """
+    Logistic regression over _features, trained offline with plain SGD.
+    """
+
+    def __init__(self, weights=None):
+        self.weights = dict(weights or {})
+
+    def fit(self, examples, epochs=200, learning_rate=0.1, l2=1e-3):
+        data = [(_features(text), label) for text, label in examples]
+        for _ in range(epochs):
+            for features, label in data:
+                error = self._predict_features(features) - label
+                for name, value in features.items():
+                    w = self.weights.get(name, 0.0)
+                    self.weights[name] = w - learning_rate * (error * value + l2 * w)
+        return self
+
+    def _predict_features(self, features):
+        z = sum(self.weights.get(name, 0.0) * value for name, value in features.items())
+        return 1.0 / (1.0 + math.exp(-max(min(z, 30.0), -30.0)))
+
+    def score(self, fact):
+        """
+        Probability in [0, 1] that a fact is verifiable against authoritative sources.
+        """
+        return self._predict_features(_features(fact))
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """
+    Return the module-level model, fitting it on SEED_EXAMPLES on first use.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = CheckWorthinessModel().fit(SEED_EXAMPLES)
+    return _model
+
+
+def score_fact(fact):
+    return get_model().score(fact)
+
+
+def split_check_worthy(facts, threshold=CHECK_WORTHINESS_THRESHOLD):
+    """
+    Score each fact and split them by the threshold.
+    Returns (check-worthy facts in order, {low-scoring fact: score}).
+    """
+    model = get_model()
+    worthy, low = [], {}
+    for fact in facts:
+        score = model.score(fact)
+        if score >= threshold:
+            worthy.append(fact)
+        else:
+            low[fact] = score
+    return worthy, low
+
+
+if __name__ == "__main__":
+    demo = [
+        "India's GDP growth rate in 2023 is projected at 6.8% by the IMF.",
+        "Warli and Gond paintings reflect harmony with nature.",
+        "The literacy rate in Kerala is the highest in India, at over 96%.",
+        "People in tribal communities worship trees and animals.",
+        "Diversity is the hallmark of Indian tribal art.",
+    ]
+    for fact in demo:
+        print(f"{score_fact(fact):.2f}  {fact}")
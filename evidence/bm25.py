@@ -0,0 +1,202 @@
+import os
+import re
+import json
+import hashlib
+from collections import Counter
+import numpy as np
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Documents are split into passages of about this many words; each passage is one search hit
+PASSAGE_WORDS = 120
+INDEX_VERSION = 2
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_STOPWORDS = frozenset(
+    "a an the of in on at to for by with and or is are was were be been has have had its it this that as from "
+    "which who what when where than into about over under".split()
+)
+
+
+def tokenize(text):
+    """
+    Case-folded word/number tokens without stopwords.
+    """
+    return [t for t in _TOKEN_RE.findall(str(text).casefold()) if t not in _STOPWORDS]
+
+
+def split_passages(text, passage_words=PASSAGE_WORDS):
+    """
+    Split a document into passages of roughly `passage_words` words, keeping paragraphs together where possible.
+    """
+    passages, current = [], []
+    for paragraph in re.split(r"\n\s*\n", text):
+        words = paragraph.split()
+        if current and len(current) + len(words) > passage_words:
+            passages.append(" ".join(current))
+            current = []
+        while len(words) > passage_words:
+            passages.append(" ".join(words[:passage_words]))
+            words = words[passage_words:]
+        current.extend(words)
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def iter_corpus_documents(corpus_dir):
+    """
+    Yield {title, text, url} for every .txt / .md file (title = first line) and every line of
+    every .jsonl file (fields title, text or content, url) under `corpus_dir`.
+    """
+    for root, _, files in os.walk(corpus_dir):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            ext = os.path.splitext(name)[1].lower()
+            if ext in (".txt", ".md"):
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    text = f.read()
+                first_line = text.strip().split("\n", 1)[0].strip()
+                yield {"title": first_line[:200] or name, "text": text, "url": f"file://{os.path.abspath(path)}"}
+            elif ext == ".jsonl":
+                with open(path, "r", encoding="utf-8") as f:
+                    for line_no, line in enumerate(f, start=1):
+                        if not line.strip():
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            print(f"Skipping malformed JSON on line {line_no} of {path}")
+                            continue
+                        yield {
+                            "title": record.get("title", ""),
+                            "text": record.get("text") or record.get("content") or "",
+                            "url": record.get("url") or f"file://{os.path.abspath(path)}#L{line_no}",
+                        }
+
+
+def corpus_fingerprint(corpus_dir):
+    """
+    Hash of the corpus location and the relative paths, sizes and modification times of its files.
+    """
+    digest = hashlib.sha256(os.path.abspath(corpus_dir).encode("utf-8"))
+    for root, _, files in os.walk(corpus_dir):
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in (".txt", ".md", ".jsonl"):
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                digest.update(f"{os.path.relpath(path, corpus_dir)}\x1f{stat.st_size}\x1f{stat.st_mtime_ns}\x1e".encode())
+    return digest.hexdigest()
+
+
+class BM25Index:
+    """
+    BM25 inverted index over passages, stored as CSR arrays.
+    Each term's postings are a slice of `doc_ids` with precomputed BM25 impact weights, so a
+    query is a handful of vectorized scatter-adds and stays in the millisecond range for large corpora.
+    """
+
+    def __init__(self, k1=BM25_K1, b=BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.passages = []  # [title, snippet, url]
+        self.terms = {}  # term -> row in offsets
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.int32)
+        self.weights = np.zeros(0, dtype=np.float32)
+        self.fingerprint = None
+
+    @classmethod
+    def build(cls, documents, passage_words=PASSAGE_WORDS, **kwargs):
+        index = cls(**kwargs)
+        postings, lengths = {}, []
+        for doc in documents:
+            for passage in split_passages(doc["text"], passage_words):
+                pid = len(index.passages)
+                terms = Counter(tokenize(f"{doc['title']} {passage}"))
+                index.passages.append([doc["title"], passage, doc["url"]])
+                lengths.append(sum(terms.values()))
+                for term, tf in terms.items():
+                    postings.setdefault(term, ([], []))
+                    postings[term][0].append(pid)
+                    postings[term][1].append(tf)
+        index._finalize(postings, np.array(lengths, dtype=np.float32))
+        return index
+
+    def _finalize(self, postings, lengths):
+        self.terms = {term: i for i, term in enumerate(postings)}
+        df = np.array([len(pids) for pids, _ in postings.values()], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+        self.doc_ids = np.fromiter((pid for pids, _ in postings.values() for pid in pids), dtype=np.int32, count=int(df.sum()))
+        tf = np.fromiter((t for _, tfs in postings.values() for t in tfs), dtype=np.float32, count=int(df.sum()))
+        n = len(lengths)
+        idf = np.log(1 + (n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = self.k1 * (1 - self.b + self.b * lengths[self.doc_ids] / max(float(lengths.mean()) if n else 1.0, 1e-9))
+        self.weights = (np.repeat(idf, df) * tf * (self.k1 + 1) / (tf + norm)).astype(np.float32)
+
+    def search(self, query, n_results=3):
+        """
+        Top `n_results` passages for `query`, at most one per URL, as {title, snippet, url} dicts, best first.
+        """
+        rows = [self.terms[term] for term in set(tokenize(query)) if term in self.terms]
+        if not rows:
+            return []
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        for row in rows:
+            start, end = self.offsets[row], self.offsets[row + 1]
+            scores[self.doc_ids[start:end]] += self.weights[start:end]
+        # Over-fetch so that several passages of one document collapse into a single hit
+        k = min(n_results * 4, int(np.count_nonzero(scores)))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        results, seen = [], set()
+        for pid in top[np.argsort(-scores[top], kind="stable")].tolist():
+            title, snippet, url = self.passages[pid]
+            if url in seen:
+                continue
+            seen.add(url)
+            results.append({"title": title, "snippet": snippet, "url": url})
+            if len(results) == n_results:
+                break
+        return results
+
+    def save(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        meta = json.dumps({
+            "version": INDEX_VERSION,
+            "fingerprint": self.fingerprint,
+            "k1": self.k1,
+            "b": self.b,
+            "terms": list(self.terms),
+            "passages": self.passages,
+        }, ensure_ascii=False)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f, offsets=self.offsets, doc_ids=self.doc_ids, weights=self.weights, meta=np.array(meta)
+            )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a saved index, or return None if the file is missing, unreadable or from another version.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("version") != INDEX_VERSION:
+                    return None
+                index = cls(k1=meta["k1"], b=meta["b"])
+                index.offsets = data["offsets"]
+                index.doc_ids = data["doc_ids"]
+                index.weights = data["weights"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable BM25 index {path}: {e}")
+            return None
+        index.terms = {term: i for i, term in enumerate(meta["terms"])}
+        index.passages = meta["passages"]
+        index.fingerprint = meta["fingerprint"]
+        return index
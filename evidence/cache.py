@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+EVIDENCE_CACHE_PATH = os.getenv("EVIDENCE_CACHE_PATH", os.path.join(".cache", "evidence.sqlite"))
+EVIDENCE_CACHE_TTL = float(os.getenv("EVIDENCE_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+EVIDENCE_CACHE_MAX_ENTRIES = int(os.getenv("EVIDENCE_CACHE_MAX_ENTRIES", "50000"))
+
+
+def normalize_query(query):
+    """
+    Canonical form of a search query: case-folded with whitespace collapsed.
+    """
+    return " ".join(str(query).casefold().split())
+
+
+def make_search_key(query, n_results, search_depth, exclude_domains, endpoint=None):
+    """
+    Stable cache key for a search: normalized query, result count, depth and a hash of the excluded domains,
+    plus the search endpoint when it is not the real API (so stand-in results are never served for it).
+    """
+    domains_hash = hashlib.sha256("\n".join(sorted(exclude_domains or [])).encode("utf-8")).hexdigest()
+    parts = [normalize_query(query), int(n_results), search_depth, domains_hash]
+    if endpoint:
+        parts.append(endpoint)
+    raw = json.dumps(parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class EvidenceCache:
+    """
+    On-disk SQLite cache of search results with per-entry TTL and LRU eviction.
+    Values are any JSON-serializable object, so other stages can keep their own `table` in it.
+    Safe to share across threads; hit/miss counters are kept per process.
+    """
+
+    def __init__(
+        self,
+        path=EVIDENCE_CACHE_PATH,
+        ttl=EVIDENCE_CACHE_TTL,
+        max_entries=EVIDENCE_CACHE_MAX_ENTRIES,
+        table="evidence"
+    ):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_last_access ON {table}(last_access)")
+        self._size = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def get(self, key):
+        """
+        Return the cached value for `key`, or None on a miss or expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] < now:
+                if row is not None:
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    self._size -= 1
+                self.misses += 1
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value under `key`, evicting least-recently-used entries beyond max_entries.
+        """
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            exists = self._conn.execute(f"SELECT 1 FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + ttl, now)
+            )
+            if not exists:
+                self._size += 1
+            if self.max_entries and self._size > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        # Another process may share the file, so re-count before trimming
+        self._size = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        excess = self._size - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f" SELECT key FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+            self._size -= excess
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self.hits = self.misses = self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def stats(self):
+        """
+        Return hit/miss counters and the current number of entries.
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
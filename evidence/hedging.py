@@ -0,0 +1,157 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+def _succeeded(future, accept):
+    return future.exception() is None and accept(future.result())
+
+
+def _pick(done, pending, accept):
+    # A successful future from `done`, else a failed one once nothing is pending, else None
+    for future in done:
+        if _succeeded(future, accept):
+            return future
+    return None if pending else next(iter(done))
+
+
+def _first_success(wait_one, pending, accept):
+    while True:
+        done, pending = wait_one(pending)
+        winner = _pick(done, pending, accept)
+        if winner is not None:
+            return winner
+
+
+def _accept_all(result):
+    return True
+
+
+class LatencyTracker:
+    """
+    Rolling window of request latencies, used to pick the hedging delay.
+    """
+
+    def __init__(self, window=500, min_samples=20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q):
+        """
+        The q-quantile (0-1) of recent latencies, or None until min_samples have been recorded.
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class Hedger:
+    """
+    Issue a duplicate request when the first one is slower than the observed p95.
+    Whichever copy succeeds first wins; the loser is cancelled (asyncio) or abandoned (threads).
+    A copy succeeds when it returns without raising and `accept(result)` is true (e.g. not an
+    HTTP 429/5xx), so a fast error response does not cancel a backup that may still succeed.
+    Only successful calls are recorded in the latency window.
+    `budget` (a RetryBudget) caps hedges to a fraction of requests; `default_delay` is used
+    until the tracker has enough samples.
+    """
+
+    def __init__(self, budget, quantile=0.95, default_delay=5.0, max_workers=32):
+        self.budget = budget
+        self.quantile = quantile
+        self.default_delay = default_delay
+        self.latency = LatencyTracker()
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def delay(self):
+        observed = self.latency.percentile(self.quantile)
+        return self.default_delay if observed is None else observed
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hedge")
+        return self._executor
+
+    def call(self, func, before_hedge=None, accept=_accept_all):
+        """
+        Run func() in a worker thread, hedging it with a second func() if it is slow.
+        """
+        self.budget.record_request()
+        start = time.monotonic()
+        executor = self._get_executor()
+        primary = executor.submit(func)
+        done, _ = wait([primary], timeout=self.delay())
+        if done or not self.budget.try_retry():
+            wait([primary])
+            if _succeeded(primary, accept):
+                self.latency.record(time.monotonic() - start)
+            return primary.result()
+
+        if before_hedge is not None:
+            before_hedge()
+        self.hedged += 1
+        hedge = executor.submit(func)
+        winner = _first_success(
+            lambda pending: wait(pending, return_when=FIRST_COMPLETED), {primary, hedge}, accept
+        )
+        if _succeeded(winner, accept):
+            self.latency.record(time.monotonic() - start)
+        if winner is hedge:
+            self.hedge_wins += 1
+        # A request already running in a thread cannot be interrupted; its response is discarded
+        (hedge if winner is primary else primary).cancel()
+        return winner.result()
+
+    async def call_async(self, coro_func, before_hedge=None, accept=_accept_all):
+        """
+        Await coro_func(), hedging it with a second coro_func() if it is slow.
+        """
+        self.budget.record_request()
+        start = time.monotonic()
+        primary = asyncio.ensure_future(coro_func())
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.delay())
+            if done or not self.budget.try_retry():
+                await asyncio.wait({primary})
+                if _succeeded(primary, accept):
+                    self.latency.record(time.monotonic() - start)
+                return primary.result()
+
+            if before_hedge is not None:
+                await before_hedge()
+            self.hedged += 1
+            hedge = asyncio.ensure_future(coro_func())
+            pending = {primary, hedge}
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = _pick(done, pending, accept)
+                if winner is not None:
+                    break
+            if _succeeded(winner, accept):
+                self.latency.record(time.monotonic() - start)
+            if winner is hedge:
+                self.hedge_wins += 1
+            return winner.result()
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self):
+        return {"hedged": self.hedged, "hedge_wins": self.hedge_wins, "delay": self.delay()}
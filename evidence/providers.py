@@ -0,0 +1,105 @@
+import os
+import asyncio
+import threading
+from typing import List, Protocol, runtime_checkable
+
+from evidence.bm25 import BM25Index, corpus_fingerprint, iter_corpus_documents
+
+# "tavily" (web search) or "local" (BM25 over EVIDENCE_CORPUS_DIR)
+EVIDENCE_PROVIDER = os.getenv("EVIDENCE_PROVIDER", "tavily")
+EVIDENCE_CORPUS_DIR = os.getenv("EVIDENCE_CORPUS_DIR", "corpus")
+EVIDENCE_INDEX_PATH = os.getenv("EVIDENCE_INDEX_PATH", os.path.join(".cache", "bm25_index.npz"))
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+@runtime_checkable
+class EvidenceProvider(Protocol):
+    """
+    Source of evidence for facts. Results are lists of {title, snippet, url} dicts, best first.
+    """
+
+    def search(self, query: str, n_results: int = 3) -> List[dict]:
+        ...
+
+    async def search_many(self, queries: List[str], n_results: int = 3) -> List[List[dict]]:
+        ...
+
+
+class TavilyProvider:
+    """
+    Web search through Tavily (evidence.web_search), with its caching, coalescing and rate limiting.
+    """
+
+    def search(self, query, n_results=3):
+        from evidence.web_search import google_search
+        return google_search(query, n_results=n_results)
+
+    async def search_many(self, queries, n_results=3):
+        from evidence.web_search import search_many
+        return await search_many(queries, n_results=n_results)
+
+
+class LocalCorpusProvider:
+    """
+    Offline BM25 search over a directory of .txt/.md/.jsonl documents.
+    The index is persisted to `index_path` and rebuilt only when the corpus files change.
+    """
+
+    def __init__(self, corpus_dir=EVIDENCE_CORPUS_DIR, index_path=EVIDENCE_INDEX_PATH):
+        self.corpus_dir = corpus_dir
+        self.index_path = index_path
+        self.index = self._load_or_build()
+
+    def _load_or_build(self):
+        if not os.path.isdir(self.corpus_dir):
+            raise FileNotFoundError(f"Evidence corpus directory not found: {self.corpus_dir}")
+        fingerprint = corpus_fingerprint(self.corpus_dir)
+        index = BM25Index.load(self.index_path) if self.index_path else None
+        if index is not None and index.fingerprint == fingerprint:
+            return index
+        index = BM25Index.build(iter_corpus_documents(self.corpus_dir))
+        index.fingerprint = fingerprint
+        if self.index_path:
+            index.save(self.index_path)
+        return index
+
+    def search(self, query, n_results=3):
+        return self.index.search(query, n_results=n_results)
+
+    async def search_many(self, queries, n_results=3):
+        # Lookups are in-memory and take milliseconds; no need to leave the event loop
+        results = [self.search(query, n_results=n_results) for query in queries]
+        await asyncio.sleep(0)
+        return results
+
+
+def build_evidence_provider(name=EVIDENCE_PROVIDER, corpus_dir=EVIDENCE_CORPUS_DIR):
+    if name == "tavily":
+        return TavilyProvider()
+    if name == "local":
+        return LocalCorpusProvider(corpus_dir)
+    raise ValueError(f"Unknown evidence provider: {name!r} (expected 'tavily' or 'local')")
+
+
+def get_evidence_provider():
+    """
+    Return the module-level evidence provider, building it from EVIDENCE_PROVIDER on first use.
+    """
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = build_evidence_provider()
+    return _provider
+
+
+def set_evidence_provider(provider):
+    """
+    Replace the module-level evidence provider. Returns the previous one.
+    """
+    global _provider
+    with _provider_lock:
+        previous, _provider = _provider, provider
+    return previous
@@ -0,0 +1,96 @@
+import os
+import re
+from evidence.bm25 import tokenize, _STOPWORDS
+
+# Evidence items kept per fact, and the minimum relevance score (0-1) to keep one
+RERANK_TOP_K = int(os.getenv("RERANK_TOP_K", "3"))
+RERANK_MIN_SCORE = float(os.getenv("RERANK_MIN_SCORE", "0.3"))
+# Always keep at least this many items, so a fact with weak evidence still reaches the LLM
+RERANK_MIN_KEEP = int(os.getenv("RERANK_MIN_KEEP", "1"))
+
+# Relative weight of each signal; signals the fact does not have (no numbers, no entities) are left out
+WEIGHTS = {"lexical": 0.5, "numeric": 0.3, "entity": 0.2}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+_ENTITY_RE = re.compile(r"\b(?:[A-Z]{2,}|[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b")
+_SENTENCE_START_RE = re.compile(r"(?:^|[.!?]\s+)([A-Z][a-z]+)\b")
+_LOWER_WORD_RE = re.compile(r"\b[a-z]+\b")
+
+
+def _numbers(text):
+    return {n.rstrip("0").rstrip(".") if "." in n else n for n in _NUMBER_RE.findall(re.sub(r"(?<=\d),(?=\d)", "", text))}
+
+
+def _entities(text):
+    # Capitalized phrases and acronyms, minus sentence-initial common words (ones also used lowercase in the
+    # text, or function words), so "India became..." keeps "india" but "The Act..." does not keep "the"
+    lowercase = set(_LOWER_WORD_RE.findall(text))
+    common = {w for w in _SENTENCE_START_RE.findall(text) if w.casefold() in lowercase or w.casefold() in _STOPWORDS}
+    entities = set()
+    for phrase in _ENTITY_RE.findall(text):
+        words = phrase.split()
+        if words[0] in common:
+            words = words[1:]
+        if words:
+            entities.add(" ".join(words).casefold())
+    return entities
+
+
+def _evidence_text(ev):
+    if isinstance(ev, dict):
+        return f"{ev.get('title', '')} {ev.get('snippet', '')}"
+    if isinstance(ev, (list, tuple)) and len(ev) >= 2:
+        return f"{ev[0]} {ev[1]}"
+    return str(ev)
+
+
+def score_evidence(fact, evidence_list):
+    """
+    Relevance of each evidence item to the fact, in [0, 1]: BM25-saturated coverage of the fact's
+    terms in the title and snippet, plus the share of the fact's numbers and named entities it contains.
+    Number and entity matches count in proportion to the term coverage, so an off-topic item
+    that merely shares a figure or a country name stays low.
+    """
+    terms = set(tokenize(fact))
+    numbers = _numbers(fact)
+    entities = _entities(fact)
+    docs = [_evidence_text(ev) for ev in evidence_list]
+    doc_terms = [tokenize(doc) for doc in docs]
+    avg_length = sum(len(t) for t in doc_terms) / max(len(doc_terms), 1) or 1.0
+
+    scores = []
+    for doc, tokens in zip(docs, doc_terms):
+        counts = {}
+        for token in tokens:
+            if token in terms:
+                counts[token] = counts.get(token, 0) + 1
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / avg_length)
+        lexical = sum(min(1.0, tf * (BM25_K1 + 1) / (tf + norm)) for tf in counts.values()) / max(len(terms), 1)
+        signals = {"lexical": lexical}
+        if numbers:
+            doc_numbers = _numbers(doc)
+            matched = sum(any(d == n or d.startswith(f"{n}.") for d in doc_numbers) for n in numbers)
+            signals["numeric"] = lexical * matched / len(numbers)
+        if entities:
+            lowered = f" {' '.join(doc.casefold().split())}"
+            signals["entity"] = lexical * sum(f" {e}" in lowered for e in entities) / len(entities)
+        total = sum(WEIGHTS[name] for name in signals)
+        scores.append(sum(WEIGHTS[name] * value for name, value in signals.items()) / total)
+    return scores
+
+
+def rerank_evidence(fact, evidence_list, top_k=RERANK_TOP_K, min_score=RERANK_MIN_SCORE, min_keep=RERANK_MIN_KEEP):
+    """
+    Keep the `top_k` evidence items most relevant to the fact whose score is at least `min_score`
+    (but never fewer than `min_keep`), best first. `top_k` <= 0 keeps every item.
+    """
+    if not evidence_list or top_k <= 0:
+        return evidence_list
+    scores = score_evidence(fact, evidence_list)
+    ranked = sorted(range(len(evidence_list)), key=lambda i: -scores[i])
+    kept = [i for i in ranked[:top_k] if scores[i] >= min_score]
+    if len(kept) < min_keep:
+        kept = ranked[:min(min_keep, top_k)]
+    return [evidence_list[i] for i in kept]
@@ -0,0 +1,207 @@
+"""
+Local stand-in for the Tavily /search endpoint, for load tests and benchmarks.
+
+Accepts the payload google_search sends (query, max_results, exclude_domains, ...) and answers
+{"query", "results": [{title, content, url, score}], "response_time"}. Results come from a
+canned JSON file ({query: [results]}) when given, otherwise they are generated deterministically
+from the query. Latency follows a configurable distribution with an optional slow tail, and a
+fraction of requests fail with 500 or 429 (+ Retry-After).
+
+Run from the project root, then point web_search at it:
+    python -m evidence.stub_server --port 8765 --latency lognormal:400:0.5 --slow-rate 0.03 --error-rate 0.01
+    TAVILY_BASE_URL=http://127.0.0.1:8765 TAVILY_API_KEY=stub python main.py --concurrent
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from evidence.cache import normalize_query
+
+STUB_DOMAINS = ["pib.gov.in", "ncert.nic.in", "indiabudget.gov.in", "imf.org", "worldbank.org", "reddit.com"]
+
+
+def parse_latency(spec):
+    """
+    Latency sampler (seconds) from a spec: "fixed:MS", "uniform:LO_MS:HI_MS" or "lognormal:MEDIAN_MS:SIGMA".
+    """
+    kind, *args = spec.split(":")
+    values = [float(a) for a in args]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(0, values[1]) * values[0] / 1000
+    raise ValueError(f"Bad latency spec {spec!r}: use fixed:MS, uniform:LO:HI or lognormal:MEDIAN:SIGMA")
+
+
+def generate_results(query, max_results, exclude_domains=()):
+    """
+    Deterministic fake results for a query, skipping excluded domains.
+    """
+    seed = int(hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()[:16], 16)
+    rng = random.Random(seed)
+    domains = [d for d in STUB_DOMAINS if not any(d.endswith(x) for x in exclude_domains)]
+    results = []
+    for i in range(max_results):
+        domain = rng.choice(domains)
+        results.append({
+            "title": f"{query[:60]} - {domain}",
+            "content": f"{query} Source {i + 1} of {max_results} discusses this claim with figures and dates. "
+                       f"Reference id {rng.randrange(10 ** 6)}.",
+            "url": f"https://{domain}/doc/{seed % 10 ** 8}/{i}",
+            "score": round(1.0 - i * 0.1, 3),
+        })
+    return results
+
+
+class StubConfig:
+    def __init__(self, latency="fixed:0", slow_rate=0.0, slow_ms=10000.0, error_rate=0.0,
+                 rate_limit_rate=0.0, retry_after=1.0, canned=None, seed=0):
+        self.sample_latency = parse_latency(latency)
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.canned = {normalize_query(q): r for q, r in (canned or {}).items()}
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    def draw(self):
+        # (latency seconds, status) for the next request
+        with self.lock:
+            self.requests += 1
+            delay = self.sample_latency(self.rng)
+            if self.rng.random() < self.slow_rate:
+                delay = self.slow_ms / 1000
+            roll = self.rng.random()
+            if roll < self.rate_limit_rate:
+                self.rate_limited += 1
+                return 0.0, 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.errors += 1
+                return delay, 500
+            return delay, 200
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    disable_nagle_algorithm = True
+    config = StubConfig()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return self._send(400, {"detail": {"error": "Invalid JSON"}})
+        if self.path.rstrip("/") != "/search":
+            return self._send(404, {"detail": {"error": "Not found"}})
+        if not payload.get("api_key") and not self.headers.get("Authorization"):
+            return self._send(401, {"detail": {"error": "Unauthorized: missing or invalid API key."}})
+
+        start = time.perf_counter()
+        delay, status = self.config.draw()
+        if status == 429:
+            return self._send(429, {"detail": {"error": "Rate limit exceeded"}},
+                              {"Retry-After": f"{self.config.retry_after:g}"})
+        time.sleep(delay)
+        if status != 200:
+            return self._send(status, {"detail": {"error": "Internal server error"}})
+
+        query = payload.get("query", "")
+        max_results = int(payload.get("max_results", 5))
+        exclude = payload.get("exclude_domains") or []
+        results = self.config.canned.get(normalize_query(query))
+        if results is None:
+            results = generate_results(query, max_results, exclude)
+        self._send(200, {
+            "query": query,
+            "answer": None,
+            "images": [],
+            "results": results[:max_results],
+            "response_time": round(time.perf_counter() - start, 3),
+        })
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up (timeout or cancelled hedge)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def handle_error(self, request, client_address):
+        # Hedged and cancelled searches drop their connection mid-request; that is expected, not a crash
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def start_stub_server(host="127.0.0.1", port=0, config=None):
+    """
+    Start the stand-in in a background thread. Returns the server; its base URL is
+    f"http://{host}:{server.server_address[1]}" and server.shutdown() stops it.
+    """
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config or StubConfig()})
+    server = _Server((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Tavily-compatible /search stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:400:0.5",
+                        help="fixed:MS, uniform:LO:HI or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of requests taking --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=10000.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429")
+    parser.add_argument("--canned", help="JSON file mapping queries to result lists")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    canned = None
+    if args.canned:
+        with open(args.canned, "r", encoding="utf-8") as f:
+            canned = json.load(f)
+    config = StubConfig(args.latency, args.slow_rate, args.slow_ms, args.error_rate,
+                        args.rate_limit_rate, args.retry_after, canned, args.seed)
+    server = start_stub_server(args.host, args.port, config)
+    print(f"Tavily stand-in on http://{args.host}:{server.server_address[1]}/search")
+    print(f"  export TAVILY_BASE_URL=http://{args.host}:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"  {config.requests} requests, {config.errors} errors, {config.rate_limited} rate-limited")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,30 @@
 import requests
 import os
 import json
+import time
+import asyncio
+import threading
+import weakref
+import httpx
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from evidence.cache import EvidenceCache, make_search_key
+from evidence.singleflight import SingleFlight
+from evidence.rate_limit import TokenBucket, RetryBudget, backoff_delay, parse_retry_after
+from evidence.hedging import Hedger
+import cassette
 
 load_dotenv()
 print(os.getenv("TAVILY_API_KEY"))
 
-def google_search(query, n_results=3):
-    """
-    Search using Tavily API (renamed to maintain compatibility).
-    Returns list of evidence dicts with same format as Google Custom Search.
-    """
-    api_key = os.getenv("TAVILY_API_KEY")
-    
-    if not api_key:
-        print("Error: TAVILY_API_KEY not found in environment variables")
-        return []
-    
-    url = "https://api.tavily.com/search"
+# Point at a local stand-in (python -m evidence.stub_server) for load tests and benchmarks
+DEFAULT_TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+TAVILY_BASE_URL = os.getenv("TAVILY_BASE_URL", "https://api.tavily.com")
+TAVILY_SEARCH_URL = f"{TAVILY_BASE_URL.rstrip('/')}/search"
+SEARCH_DEPTH = "advanced"
 
-    UPSC_EXCLUDE_DOMAINS = [
+UPSC_EXCLUDE_DOMAINS = [
     "reddit.com",
     "quora.com",
     "facebook.com",
@@ -32,41 +37,239 @@ def google_search(query, n_results=3):
     "twitter.com",
     "linkedin.com"
     # Add more as you identify additional unwanted sources
-    ]
+]
+
+# Connection pool / retry settings for the shared search session
+SEARCH_POOL_SIZE = int(os.getenv("TAVILY_POOL_SIZE", "10"))
+SEARCH_MAX_RETRIES = int(os.getenv("TAVILY_MAX_RETRIES", "4"))
+# Transport-level retries, only for connections that could not be opened (nothing was sent yet)
+SEARCH_CONNECT_RETRIES = int(os.getenv("TAVILY_CONNECT_RETRIES", "2"))
+SEARCH_BACKOFF_FACTOR = float(os.getenv("TAVILY_BACKOFF_FACTOR", "0.5"))
+
+# Client-side throttle shared by every search caller (TAVILY_RPM=0 disables it)
+SEARCH_RATE_PER_MINUTE = float(os.getenv("TAVILY_RPM", "1000"))
+SEARCH_BURST = int(os.getenv("TAVILY_BURST", "10"))
+# Responses retried with jittered backoff (or Retry-After), within a budget of ~20% extra requests
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+SEARCH_RETRY_BUDGET_RATIO = float(os.getenv("TAVILY_RETRY_BUDGET", "0.2"))
+SEARCH_MAX_BACKOFF = float(os.getenv("TAVILY_MAX_BACKOFF", "20"))
+
+# Hedging: re-issue a search still running after the observed p95 latency (TAVILY_HEDGE=1 to enable),
+# for at most TAVILY_HEDGE_RATE of requests
+SEARCH_HEDGE_ENABLED = os.getenv("TAVILY_HEDGE", "0") == "1"
+SEARCH_HEDGE_RATE = float(os.getenv("TAVILY_HEDGE_RATE", "0.05"))
+SEARCH_HEDGE_DEFAULT_DELAY = float(os.getenv("TAVILY_HEDGE_DELAY", "8"))  # seconds, until p95 is known
+
+# Default number of in-flight searches for search_many
+SEARCH_CONCURRENCY = int(os.getenv("TAVILY_CONCURRENCY", "8"))
+
+# Set EVIDENCE_CACHE=0 to always hit Tavily
+EVIDENCE_CACHE_ENABLED = os.getenv("EVIDENCE_CACHE", "1") != "0"
+
+_session = None
+_session_lock = threading.Lock()
+# Shared AsyncClient per event loop (httpx clients cannot be used across loops)
+_async_clients = weakref.WeakKeyDictionary()
+_cache = None
+_cache_lock = threading.Lock()
+
+# Concurrent identical searches (same normalized query and params) share one Tavily request
+search_flight = SingleFlight()
+search_rate_limiter = TokenBucket(SEARCH_RATE_PER_MINUTE / 60, burst=SEARCH_BURST)
+search_retry_budget = RetryBudget(ratio=SEARCH_RETRY_BUDGET_RATIO)
+search_hedger = Hedger(RetryBudget(ratio=SEARCH_HEDGE_RATE, min_tokens=1), default_delay=SEARCH_HEDGE_DEFAULT_DELAY)
+
+
+def build_search_session(
+    pool_size=SEARCH_POOL_SIZE,
+    connect_retries=SEARCH_CONNECT_RETRIES,
+    backoff_factor=SEARCH_BACKOFF_FACTOR
+):
+    """
+    Build a requests.Session with a pooled keep-alive HTTPAdapter.
+    Only failures to connect are retried by the adapter, with exponential backoff. A POST that
+    timed out may already have been processed, so read errors and 429/5xx responses are left to
+    google_search's own retry loop, under the shared rate limiter and retry budget.
+    """
+    retry = Retry(
+        total=connect_retries,
+        connect=connect_retries,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=backoff_factor,
+        allowed_methods=frozenset(["POST"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Content-Type": "application/json",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+def get_search_session():
+    """
+    Return the module-level search session, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_search_session()
+    return _session
+
+
+def set_search_session(session):
+    """
+    Replace the module-level search session (e.g. with a custom pool size or a test double).
+    Returns the previous session, which is not closed.
+    """
+    global _session
+    with _session_lock:
+        previous, _session = _session, session
+    return previous
 
-    
-    payload = {
+
+def get_evidence_cache():
+    """
+    Return the module-level evidence cache, opening it on first use.
+    Returns None when caching is disabled.
+    """
+    global _cache
+    if _cache is None and EVIDENCE_CACHE_ENABLED:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EvidenceCache()
+    return _cache
+
+
+def set_evidence_cache(cache):
+    """
+    Replace the module-level evidence cache; pass None to disable caching.
+    Returns the previous cache, which is not closed.
+    """
+    global _cache, EVIDENCE_CACHE_ENABLED
+    with _cache_lock:
+        previous, _cache = _cache, cache
+        EVIDENCE_CACHE_ENABLED = cache is not None
+    return previous
+
+
+def _search_key(query, n_results):
+    # Keys for the real API are unchanged; any other endpoint gets its own cache and cassette entries
+    endpoint = TAVILY_SEARCH_URL if TAVILY_SEARCH_URL != DEFAULT_TAVILY_SEARCH_URL else None
+    return make_search_key(query, n_results, SEARCH_DEPTH, UPSC_EXCLUDE_DOMAINS, endpoint)
+
+
+def _build_payload(api_key, query, n_results):
+    return {
         "api_key": api_key,
         "query": query,
-        "search_depth": "advanced",
+        "search_depth": SEARCH_DEPTH,
         "max_results": n_results,
         "include_answer": "advanced",  # Set to True if you want AI summary
         "include_images": False,
         "include_raw_content": False,
         "exclude_domains": UPSC_EXCLUDE_DOMAINS,
     }
-    
-    headers = {
-        "Content-Type": "application/json"
-    }
-    
+
+
+def _is_success(resp):
+    # Hedged copies only win with a usable response, not a fast 429/5xx
+    return resp.status_code < 400
+
+
+def _retry_delay(resp, attempt, max_retries):
+    # Seconds to wait before retrying a response, or None if it should not be retried
+    if resp.status_code not in RETRY_STATUSES or attempt >= max_retries:
+        return None
+    if not search_retry_budget.try_retry():
+        return None
+    delay = parse_retry_after(resp.headers.get("Retry-After"))
+    if delay is not None:
+        # The server asked everyone to slow down, not just this request
+        search_rate_limiter.pause(delay)
+        return min(delay, SEARCH_MAX_BACKOFF)
+    return backoff_delay(attempt, base=SEARCH_BACKOFF_FACTOR, cap=SEARCH_MAX_BACKOFF)
+
+
+def _parse_results(data):
+    results = []
+    for item in data.get("results", []):
+        # Maintain exact same format as Google Custom Search
+        evidence = {
+            "title": item.get("title", ""),
+            "snippet": item.get("content", ""),
+            "url": item.get("url", "")
+        }
+        results.append(evidence)
+    return results
+
+
+def google_search(query, n_results=3, session=None):
+    """
+    Search using Tavily API (renamed to maintain compatibility).
+    Returns list of evidence dicts with same format as Google Custom Search.
+    Requests go through a pooled keep-alive session; pass `session` to override the shared one.
+    All callers share a token-bucket rate limit; 429/5xx responses are retried with jittered
+    backoff (or after Retry-After) while the retry budget allows. With TAVILY_HEDGE=1, a request
+    slower than the observed p95 is duplicated and the first successful response wins.
+    Successful results are served from the evidence cache on repeat queries, and concurrent
+    identical queries share one outstanding request.
+    """
+    cache = get_evidence_cache()
+    key = _search_key(query, n_results)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    return search_flight.do(key, lambda: cassette.call(
+        "search", [key], lambda: _fetch(query, n_results, session or get_search_session(), key)
+    ))
+
+
+def _fetch(query, n_results, session, key):
+    api_key = os.getenv("TAVILY_API_KEY")
+
+    if not api_key:
+        print("Error: TAVILY_API_KEY not found in environment variables")
+        return []
+
+    payload = _build_payload(api_key, query, n_results)
+    search_retry_budget.record_request()
+
     try:
-        resp = requests.post(url, json=payload, headers=headers, timeout=30)
+        for attempt in range(SEARCH_MAX_RETRIES + 1):
+            search_rate_limiter.acquire()
+            if SEARCH_HEDGE_ENABLED:
+                resp = search_hedger.call(
+                    lambda: session.post(TAVILY_SEARCH_URL, json=payload, timeout=30),
+                    before_hedge=search_rate_limiter.acquire,
+                    accept=_is_success,
+                )
+            else:
+                resp = session.post(TAVILY_SEARCH_URL, json=payload, timeout=30)
+            delay = _retry_delay(resp, attempt, SEARCH_MAX_RETRIES)
+            if delay is None:
+                break
+            time.sleep(delay)
         resp.raise_for_status()
-        data = resp.json()
-        # print(data)
-        results = []
-        for item in data.get("results", []):
-            # Maintain exact same format as Google Custom Search
-            evidence = {
-                "title": item.get("title", ""),
-                "snippet": item.get("content", ""),
-                "url": item.get("url", "")
-            }
-            results.append(evidence)
-        
+        results = _parse_results(resp.json())
+        cache = get_evidence_cache()
+        if cache is not None:
+            cache.set(key, results)
         return results
-    
+
     except requests.exceptions.RequestException as e:
         print(f"Error: {e}")
         return []
@@ -74,6 +277,119 @@ def google_search(query, n_results=3):
         print(f"Unexpected error: {e}")
         return []
 
+
+def build_async_search_client(pool_size=SEARCH_POOL_SIZE, connect_retries=SEARCH_CONNECT_RETRIES):
+    """
+    Build an httpx.AsyncClient with a keep-alive connection pool; the transport only retries failed connects.
+    The client is bound to the running event loop; get_async_search_client keeps one per loop.
+    """
+    return httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(retries=connect_retries),
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        headers={"Content-Type": "application/json"},
+        timeout=30,
+    )
+
+
+def get_async_search_client():
+    """
+    Return the shared AsyncClient for the running event loop, creating it on first use,
+    so searches on one loop reuse keep-alive connections. Close it with close_async_search_client().
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _async_clients[loop] = build_async_search_client()
+    return client
+
+
+async def close_async_search_client():
+    """
+    Close the running event loop's shared AsyncClient, if one was created.
+    """
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def google_search_async(query, n_results=3, client=None):
+    """
+    Asyncio-native variant of google_search.
+    Returns the same list of {title, snippet, url} dicts; errors are printed and yield [].
+    Identical queries in flight on the same event loop share one request.
+    Without `client`, the loop's shared client is used (see get_async_search_client).
+    """
+    if client is None:
+        client = get_async_search_client()
+
+    cache = get_evidence_cache()
+    key = _search_key(query, n_results)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    return await search_flight.do_async(key, lambda: cassette.call_async(
+        "search", [key], lambda: _fetch_async(query, n_results, client, key)
+    ))
+
+
+async def _fetch_async(query, n_results, client, key):
+    api_key = os.getenv("TAVILY_API_KEY")
+
+    if not api_key:
+        print("Error: TAVILY_API_KEY not found in environment variables")
+        return []
+
+    payload = _build_payload(api_key, query, n_results)
+    search_retry_budget.record_request()
+
+    try:
+        for attempt in range(SEARCH_MAX_RETRIES + 1):
+            await search_rate_limiter.acquire_async()
+            if SEARCH_HEDGE_ENABLED:
+                resp = await search_hedger.call_async(
+                    lambda: client.post(TAVILY_SEARCH_URL, json=payload),
+                    before_hedge=search_rate_limiter.acquire_async,
+                    accept=_is_success,
+                )
+            else:
+                resp = await client.post(TAVILY_SEARCH_URL, json=payload)
+            delay = _retry_delay(resp, attempt, SEARCH_MAX_RETRIES)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        resp.raise_for_status()
+        results = _parse_results(resp.json())
+        cache = get_evidence_cache()
+        if cache is not None:
+            cache.set(key, results)
+        return results
+
+    except httpx.HTTPError as e:
+        print(f"Error: {e}")
+        return []
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return []
+
+
+async def search_many(facts, n_results=3, concurrency=SEARCH_CONCURRENCY, client=None):
+    """
+    Run google_search_async for every fact with at most `concurrency` requests in flight.
+    Returns a list of evidence lists in the same order as `facts`.
+    """
+    if client is None:
+        client = get_async_search_client()
+
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def _bounded(fact):
+        async with semaphore:
+            return await google_search_async(fact, n_results=n_results, client=client)
+
+    return await asyncio.gather(*(_bounded(fact) for fact in facts))
+
 if __name__ == "__main__":
     result = google_search("Who is the Prime Minister of India?", n_results=3)
     print(json.dumps(result, indent=2))
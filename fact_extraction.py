@@ -1,59 +1,219 @@
 import os
+import json
+import time
+import hashlib
+import threading
 from dotenv import load_dotenv
 import langextract as lx
+from evidence.cache import EvidenceCache
+from answer_cleaning import clean_answer
+import cassette
 
 # Load Azure OpenAI credentials from .env file
 load_dotenv()
 
+EXTRACTION_MODEL_ID = "gemini-2.5-flash"
 
+# Chunks per LangExtract batch and parallel model calls for extract_facts_batch
+EXTRACTION_BATCH_LENGTH = int(os.getenv("EXTRACTION_BATCH_LENGTH", "20"))
+EXTRACTION_MAX_WORKERS = int(os.getenv("EXTRACTION_MAX_WORKERS", "10"))
 
-def extract_facts(answer_text):
+# Strip duplicated OCR markup from answers before extraction; set EXTRACTION_CLEAN_ANSWERS=0 to send raw text
+EXTRACTION_CLEAN_ANSWERS = os.getenv("EXTRACTION_CLEAN_ANSWERS", "1") != "0"
+
+# Persistent extraction cache; set EXTRACTION_CACHE=0 to always call the model
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE", "1") != "0"
+EXTRACTION_CACHE_PATH = os.getenv("EXTRACTION_CACHE_PATH", os.path.join(".cache", "extractions.sqlite"))
+EXTRACTION_CACHE_TTL = float(os.getenv("EXTRACTION_CACHE_TTL", str(90 * 24 * 3600)))  # seconds
+
+_cache = None
+_cache_lock = threading.Lock()
+
+EXTRACTION_PROMPT = (
+    "Extract all factual claims from the given answer. "
+    "Each claim should correspond to a statement that could be verified through authoritative sources such as government, IMF, World Bank reports, or official statistics. "
+    "Ignore subjective, philosophical, or rhetorical sentences."
+)
+
+EXTRACTION_EXAMPLES = [
+    lx.data.ExampleData(
+        text="India's GDP growth rate in 2023 is projected at 6.8% by the IMF.",
+        extractions=[
+            lx.data.Extraction(
+                extraction_class="Fact",
+                extraction_text="India's GDP growth rate in 2023 is projected at 6.8% by the IMF.",
+                attributes={"source": "IMF"}
+            )
+        ]
+    ),
+    lx.data.ExampleData(
+        text="The literacy rate in Kerala is the highest in India, at over 96%.",
+        extractions=[
+            lx.data.Extraction(
+                extraction_class="Fact",
+                extraction_text="The literacy rate in Kerala is the highest in India, at over 96%.",
+                attributes={"region": "Kerala"}
+            )
+        ]
+    )
+    # Add more if desired for even tighter format!
+]
+
+
+def get_extraction_cache():
     """
-    Uses LangExtract to extract factual claims from an answer string.
-    Returns a list of fact strings.
+    Return the module-level extraction cache, opening it on first use.
+    Returns None when caching is disabled.
     """
-    prompt = (
-        "Extract all factual claims from the given answer. "
-        "Each claim should correspond to a statement that could be verified through authoritative sources such as government, IMF, World Bank reports, or official statistics. "
-        "Ignore subjective, philosophical, or rhetorical sentences."
-    )
+    global _cache
+    if _cache is None and EXTRACTION_CACHE_ENABLED:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EvidenceCache(EXTRACTION_CACHE_PATH, ttl=EXTRACTION_CACHE_TTL, table="extractions")
+    return _cache
+
+
+def set_extraction_cache(cache):
+    """
+    Replace the module-level extraction cache; pass None to disable caching.
+    Returns the previous cache, which is not closed.
+    """
+    global _cache, EXTRACTION_CACHE_ENABLED
+    with _cache_lock:
+        previous, _cache = _cache, cache
+        EXTRACTION_CACHE_ENABLED = cache is not None
+    return previous
+
 
+def _prompt_fingerprint():
+    # Any edit to the prompt or few-shot examples invalidates cached extractions
     examples = [
-        lx.data.ExampleData(
-            text="India's GDP growth rate in 2023 is projected at 6.8% by the IMF.",
-            extractions=[
-                lx.data.Extraction(
-                    extraction_class="Fact",
-                    extraction_text="India's GDP growth rate in 2023 is projected at 6.8% by the IMF.",
-                    attributes={"source": "IMF"}
-                )
-            ]
-        ),
-        lx.data.ExampleData(
-            text="The literacy rate in Kerala is the highest in India, at over 96%.",
-            extractions=[
-                lx.data.Extraction(
-                    extraction_class="Fact",
-                    extraction_text="The literacy rate in Kerala is the highest in India, at over 96%.",
-                    attributes={"region": "Kerala"}
-                )
-            ]
-        )
-        # Add more if desired for even tighter format!
+        [ex.text, [[e.extraction_class, e.extraction_text, e.attributes] for e in ex.extractions]]
+        for ex in EXTRACTION_EXAMPLES
     ]
+    raw = json.dumps([EXTRACTION_PROMPT, examples], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+PROMPT_FINGERPRINT = _prompt_fingerprint()
+
+
+def make_extraction_key(answer_text, model_id=EXTRACTION_MODEL_ID):
+    """
+    Cache key for an extraction: SHA-256 of the answer text, the model id and the prompt/examples hash.
+    """
+    answer_hash = hashlib.sha256(answer_text.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{answer_hash}:{model_id}:{PROMPT_FINGERPRINT}".encode("utf-8")).hexdigest()
+
+
+def _extract(answer_text):
     # Optionally add example extraction if you want more control (few-shot)
     # See LangExtract docs for advanced schema
     result = lx.extract(
         text_or_documents=answer_text,
-        prompt_description=prompt,
-        model_id="gemini-2.5-flash",
+        prompt_description=EXTRACTION_PROMPT,
+        model_id=EXTRACTION_MODEL_ID,
         api_key=os.environ["GOOGLE_API_KEY"],
-        examples=examples
+        examples=EXTRACTION_EXAMPLES
     )
     # Get extracted facts
-    facts = [ex.extraction_text for ex in result.extractions]
+    return [ex.extraction_text for ex in result.extractions]
+
+
+def _extract_batch(documents, batch_length, max_workers):
+    # Returns {document id: facts}
+    annotated = lx.extract(
+        text_or_documents=documents,
+        prompt_description=EXTRACTION_PROMPT,
+        model_id=EXTRACTION_MODEL_ID,
+        api_key=os.environ["GOOGLE_API_KEY"],
+        examples=EXTRACTION_EXAMPLES,
+        batch_length=batch_length,
+        max_workers=max_workers
+    )
+    return {doc.document_id: [ex.extraction_text for ex in doc.extractions or []] for doc in annotated}
+
+
+def _extract_recorded(documents, keys, batch_length, max_workers):
+    # _extract_batch through the active cassette. Each answer is also recorded as its own "extract" call,
+    # so a batched recording replays in --concurrent/--pipeline mode (which extract per answer) and vice versa.
+    active = cassette.get_cassette()
+    if active is None:
+        return _extract_batch(documents, batch_length, max_workers)
+
+    batch_key = [[doc.document_id, keys[doc.document_id]] for doc in documents]
+    recorded_per_answer = active.mode == "replay" or (
+        active.mode == "auto" and all(active.has("extract", [keys[doc.document_id]]) for doc in documents)
+    )
+    if recorded_per_answer and not active.has("extract_batch", batch_key):
+        return {
+            doc.document_id: active.call("extract", [keys[doc.document_id]], lambda doc=doc: _extract(doc.text))
+            for doc in documents
+        }
+
+    def _record():
+        start = time.perf_counter()
+        extracted = _extract_batch(documents, batch_length, max_workers)
+        latency = (time.perf_counter() - start) / len(documents)  # the batch's time, shared evenly
+        for doc in documents:
+            active.add("extract", [keys[doc.document_id]], extracted.get(doc.document_id, []), latency)
+        return extracted
+
+    return active.call("extract_batch", batch_key, _record)
+
+
+def extract_facts(answer_text):
+    """
+    Uses LangExtract to extract factual claims from an answer string.
+    Returns a list of fact strings; unchanged answers are served from the extraction cache.
+    """
+    if EXTRACTION_CLEAN_ANSWERS:
+        answer_text = clean_answer(answer_text)
+
+    cache = get_extraction_cache()
+    key = make_extraction_key(answer_text)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    facts = cassette.call("extract", [key], lambda: _extract(answer_text))
+    if cache is not None:
+        cache.set(key, facts)
     return facts
 
+
+def extract_facts_batch(answers, batch_length=EXTRACTION_BATCH_LENGTH, max_workers=EXTRACTION_MAX_WORKERS):
+    """
+    Extract facts from many answers in a single LangExtract call, one document per answer.
+    Cached answers are skipped; only new or edited answers are sent to the model.
+    Returns a list of fact lists in the same order as `answers`; empty answers yield [].
+    """
+    cache = get_extraction_cache()
+    facts_by_id = {}
+    documents, keys = [], {}
+    for i, answer in enumerate(answers):
+        if EXTRACTION_CLEAN_ANSWERS:
+            answer = clean_answer(answer)
+        if not answer or not answer.strip():
+            continue
+        doc_id = f"answer_{i}"
+        keys[doc_id] = make_extraction_key(answer)
+        cached = cache.get(keys[doc_id]) if cache is not None else None
+        if cached is not None:
+            facts_by_id[doc_id] = cached
+        else:
+            documents.append(lx.data.Document(text=answer, document_id=doc_id))
+
+    if documents:
+        extracted = _extract_recorded(documents, keys, batch_length, max_workers)
+        for doc_id, facts in extracted.items():
+            facts_by_id[doc_id] = facts
+            if cache is not None:
+                cache.set(keys[doc_id], facts)
+
+    return [facts_by_id.get(f"answer_{i}", []) for i in range(len(answers))]
+
 # Demo usage
 if __name__ == "__main__":
     answer = (
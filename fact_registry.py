@@ -0,0 +1,166 @@
+import re
+import zlib
+import asyncio
+import random
+
+# Jaccard similarity of character shingles above which two facts count as the same claim
+NEAR_DUPLICATE_THRESHOLD = 0.75
+SHINGLE_SIZE = 4
+NUM_PERM = 64
+LSH_BANDS = 16  # 16 bands x 4 rows: candidates from ~0.5 similarity, verified exactly
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+_QUOTES = str.maketrans({"’": "'", "‘": "'", "“": '"', "”": '"', "–": "-", "—": "-"})
+_THOUSANDS_RE = re.compile(r"(?<=\d),(?=\d{3}\b)")
+_PERCENT_RE = re.compile(r"\s*(?:per\s*cent\b|percent\b|%)")
+_TRAILING_ZERO_RE = re.compile(r"(\d+)\.0+\b")
+_PUNCT_RE = re.compile(r"[^\w\s%.]|(?<!\d)\.|\.(?!\d)")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?%?")
+_NEGATION_RE = re.compile(r"\b(?:not|no|never|without)\b|n't\b")
+_ENTITY_RE = re.compile(r"\b[A-Z][A-Za-z]*\b")
+# Capitalized function words that start a sentence rather than name something
+_FUNCTION_WORDS = frozenset(
+    "a an the this that these those it its there in on at by for from of to with as after before during since "
+    "under over according while when if".split()
+)
+_WORD_RE = re.compile(r"[a-z]+")
+# Directional and superlative words, folded to the direction they assert, so "rose" and "fell"
+# (or "highest" and "lowest") never merge
+_POLARITY = {
+    **dict.fromkeys("increase increased increases increasing rise rises rose risen rising grew grow grows growth "
+                    "gained up higher more above over exceeds exceeded".split(), "up"),
+    **dict.fromkeys("decrease decreased decreases decreasing decline declined declines declining fall falls fell "
+                    "fallen falling dropped drop drops shrank down lower less fewer below under".split(), "down"),
+    **dict.fromkeys("highest largest biggest most maximum top".split(), "most"),
+    **dict.fromkeys("lowest smallest least minimum".split(), "least"),
+}
+
+
+def canonicalize_fact(text):
+    """
+    Canonical form of a fact: case-folded, apostrophes dropped, unicode dashes folded, thousands separators
+    and "per cent" normalized, punctuation dropped and whitespace collapsed.
+    """
+    text = str(text).translate(_QUOTES).casefold().replace("'", "")
+    text = _THOUSANDS_RE.sub("", text)
+    text = _PERCENT_RE.sub("%", text)
+    text = _TRAILING_ZERO_RE.sub(r"\1", text)
+    text = _PUNCT_RE.sub(" ", text)
+    return " ".join(text.split())
+
+
+def claim_anchors(fact):
+    """
+    Negations ("n't" counted as "not"), named entities (capitalized words and acronyms) and directions
+    (increase/decrease, highest/lowest, ...) of a fact.
+    Near-duplicates only merge when these match, so "is a member" and "is not a member" stay apart.
+    """
+    text = str(fact).translate(_QUOTES)
+    negations = tuple(sorted("not" if t == "n't" else t for t in _NEGATION_RE.findall(text.casefold())))
+    entities = frozenset(w.casefold() for w in _ENTITY_RE.findall(text) if w.casefold() not in _FUNCTION_WORDS)
+    polarity = tuple(sorted(_POLARITY[w] for w in _WORD_RE.findall(text.casefold()) if w in _POLARITY))
+    return negations, entities, polarity
+
+
+def _shingles(canonical):
+    padded = f" {canonical} "
+    if len(padded) <= SHINGLE_SIZE:
+        return {padded}
+    return {padded[i:i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1)}
+
+
+def _minhash(shingles):
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+class FactRegistry:
+    """
+    Run-wide registry mapping facts to canonical claim ids.
+    Exact canonical matches and near-duplicates (MinHash/LSH candidates verified by shingle
+    Jaccard, with identical numbers, negations, named entities and directions) share one id, so each distinct claim is searched and
+    validated once. Per-claim values (evidence, verdicts) are stored by `kind`; while a value
+    is being computed, other asyncio tasks can await it instead of redoing the work.
+    """
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD, stats=None):
+        self.threshold = threshold
+        self._by_canonical = {}
+        self._claims = []  # id -> (representative fact, shingles, numbers, anchors)
+        self._buckets = {}
+        self._values = {}
+        self._inflight = {}
+        # Pass `stats` to aggregate counts from several registries into one dict
+        self.stats = stats if stats is not None else {"distinct": 0, "near_duplicates": 0}
+
+    def claim_id(self, fact):
+        """
+        Return the claim id for a fact, registering a new claim if no equivalent one is known.
+        """
+        canonical = canonicalize_fact(fact)
+        if canonical in self._by_canonical:
+            return self._by_canonical[canonical]
+
+        shingles = _shingles(canonical)
+        numbers = frozenset(_NUMBER_RE.findall(canonical))
+        anchors = claim_anchors(fact)
+        signature = _minhash(shingles)
+        rows = NUM_PERM // LSH_BANDS
+        band_keys = [(band, tuple(signature[band * rows:(band + 1) * rows])) for band in range(LSH_BANDS)]
+
+        candidates = set()
+        for key in band_keys:
+            candidates.update(self._buckets.get(key, ()))
+        for cid in sorted(candidates):
+            _, other_shingles, other_numbers, other_anchors = self._claims[cid]
+            if other_numbers != numbers or other_anchors != anchors:
+                continue
+            jaccard = len(shingles & other_shingles) / len(shingles | other_shingles)
+            if jaccard >= self.threshold:
+                self.stats["near_duplicates"] += 1
+                self._by_canonical[canonical] = cid
+                return cid
+
+        cid = len(self._claims)
+        self._claims.append((fact, shingles, numbers, anchors))
+        self._by_canonical[canonical] = cid
+        for key in band_keys:
+            self._buckets.setdefault(key, []).append(cid)
+        self.stats["distinct"] += 1
+        return cid
+
+    def representative(self, cid):
+        """
+        The first fact text registered for a claim id.
+        """
+        return self._claims[cid][0]
+
+    def get(self, kind, cid):
+        return self._values.get((kind, cid))
+
+    def inflight(self, kind, cid):
+        """
+        Future for a value another task is currently computing, or None.
+        """
+        return self._inflight.get((kind, cid))
+
+    def start(self, kind, cid):
+        """
+        Mark a value as being computed by the current task; must be followed by finish().
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[(kind, cid)] = future
+        return future
+
+    def finish(self, kind, cid, value, keep=True):
+        """
+        Publish a computed value to waiting tasks, storing it for later reuse if `keep`.
+        """
+        if keep:
+            self._values[(kind, cid)] = value
+        future = self._inflight.pop((kind, cid), None)
+        if future is not None and not future.done():
+            future.set_result(value)
@@ -0,0 +1,99 @@
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from langchain_core.messages import AIMessage
+
+VERDICTS = ("Supported", "Refuted", "Cannot Conclude")
+_FACT_RE = re.compile(r"^FACT (\d+): (.*)$", re.MULTILINE)
+_EVIDENCE_RE = re.compile(r"^EVIDENCE (\d+)\.(\d+):", re.MULTILINE)
+_FILLER = (
+    "The cited source reports the same figure and date, and no other evidence contradicts it, "
+    "so the claim is consistent with the official data referenced in the snippet."
+).split()
+
+
+class FakeChatModel:
+    """
+    Deterministic stand-in for AzureChatOpenAI in validate_facts_batch benchmarks.
+    Answers a validation prompt with one "fact_N" object per FACT line, with reasoning sized like
+    o4-mini output (~25-40 words) and citations to that fact's EVIDENCE lines. Responses depend only
+    on the prompt and seed. Optional faults stress the parser and retry paths:
+    `malformed_rate` (invalid JSON), `truncated_rate` (cut off mid-object, as when hitting the
+    token limit) and `drop_rate` (per-fact chance of omitting its key).
+    Latency is `latency` seconds plus `seconds_per_token` per output token (~4 chars).
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        seconds_per_token=0.0,
+        malformed_rate=0.0,
+        truncated_rate=0.0,
+        drop_rate=0.0,
+        seed=0,
+        deployment_name="fake-o4-mini",
+    ):
+        self.latency = latency
+        self.seconds_per_token = seconds_per_token
+        self.malformed_rate = malformed_rate
+        self.truncated_rate = truncated_rate
+        self.drop_rate = drop_rate
+        self.seed = seed
+        self.deployment_name = deployment_name
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "malformed": 0, "truncated": 0, "dropped_facts": 0, "output_tokens": 0}
+
+    def _respond(self, prompt):
+        # Returns (response text, simulated latency in seconds)
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode("utf-8")).digest()
+        rng = random.Random(int.from_bytes(digest[:8], "big"))
+        evidence_counts = {}
+        for fact_num, _ in _EVIDENCE_RE.findall(prompt):
+            evidence_counts[int(fact_num)] = evidence_counts.get(int(fact_num), 0) + 1
+
+        results, dropped = {}, 0
+        for fact_num, fact in _FACT_RE.findall(prompt):
+            idx = int(fact_num)
+            if rng.random() < self.drop_rate:
+                dropped += 1
+                continue
+            n_evidence = evidence_counts.get(idx, 0)
+            verdict = rng.choice(VERDICTS) if n_evidence else "Cannot Conclude"
+            cited = sorted(rng.sample(range(1, n_evidence + 1), min(n_evidence, rng.randint(1, 2)))) if n_evidence else []
+            words = fact.split()[:12] + _FILLER[:rng.randint(14, len(_FILLER))]
+            results[f"fact_{idx}"] = {
+                "verdict": verdict,
+                "reasoning": " ".join(words) + ".",
+                "cited_evidence": [f"EVIDENCE {idx}.{e}" for e in cited],
+            }
+
+        text = json.dumps(results, indent=2)
+        fault = rng.random()
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["dropped_facts"] += dropped
+            if fault < self.malformed_rate:
+                self.stats["malformed"] += 1
+                text = "Here is the analysis:\n" + text.replace('",\n', '"\n', 1)
+            elif fault < self.malformed_rate + self.truncated_rate:
+                self.stats["truncated"] += 1
+                text = text[:rng.randint(len(text) // 4, max(len(text) * 3 // 4, 1))]
+            tokens = len(text) // 4
+            self.stats["output_tokens"] += tokens
+        return text, self.latency + tokens * self.seconds_per_token
+
+    def invoke(self, prompt):
+        text, delay = self._respond(str(prompt))
+        if delay > 0:
+            time.sleep(delay)
+        return AIMessage(content=text)
+
+    async def ainvoke(self, prompt):
+        text, delay = self._respond(str(prompt))
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return AIMessage(content=text)
@@ -1,65 +1,518 @@
+import os
 import json
-from fact_extraction import extract_facts
-from validation_and_reasoning import validate_facts_batch
-from evidence.web_search import google_search
+import asyncio
+import argparse
+import validation_and_reasoning
+from fact_extraction import extract_facts, extract_facts_batch, get_extraction_cache, set_extraction_cache
+from validation_and_reasoning import (
+    validate_facts_batch, validate_facts_batch_async, get_verdict_cache, set_verdict_cache, get_semantic_cache,
+    save_semantic_caches, build_validation_prompt, count_tokens
+)
+from evidence.providers import (
+    EVIDENCE_PROVIDER, EVIDENCE_CORPUS_DIR, build_evidence_provider, get_evidence_provider, set_evidence_provider
+)
+from evidence.web_search import (
+    get_evidence_cache, set_evidence_cache, search_flight, search_rate_limiter, search_retry_budget, search_hedger,
+    close_async_search_client
+)
+from pipeline import Stage, run_pipeline
+from check_worthiness import split_check_worthy, CHECK_WORTHINESS_THRESHOLD
+from fact_registry import FactRegistry
+from cassette import Cassette, CASSETTE_LATENCY_SCALE, get_cassette, set_cassette
+from evidence.rerank import rerank_evidence, RERANK_TOP_K, RERANK_MIN_SCORE
 
+# Max QA pairs in flight at once in --concurrent mode
+MAX_PAIRS_IN_FLIGHT = int(os.getenv("MAX_PAIRS_IN_FLIGHT", "4"))
 
-def main():
+# Worker counts and queue size for --pipeline mode
+EXTRACT_WORKERS = int(os.getenv("PIPELINE_EXTRACT_WORKERS", "2"))
+SEARCH_WORKERS = int(os.getenv("PIPELINE_SEARCH_WORKERS", "2"))
+VALIDATE_WORKERS = int(os.getenv("PIPELINE_VALIDATE_WORKERS", "4"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+
+# What to do with facts below the check-worthiness threshold:
+# "skip" (no search or validation), "downgrade" (fewer search results) or "off" (default, validate every fact)
+CHECK_WORTHINESS_MODE = os.getenv("CHECK_WORTHINESS_MODE", "off")
+N_RESULTS = 5
+DOWNGRADED_N_RESULTS = 2
+# Evidence items kept per fact after local reranking; set RERANK=0 to forward all N_RESULTS
+RERANK_ENABLED = os.getenv("RERANK", "1") != "0"
+
+NO_EVIDENCE_RESULT = {"verdict": "No evidence", "reasoning": "No relevant web data found.", "supporting_urls": []}
+
+# Run-wide counters reported at the end of main
+run_stats = {
+    "no_evidence_facts": 0,
+    "prompt_tokens_saved": 0,
+    "not_check_worthy": 0,
+    "searches_saved": 0,
+    "search_results_saved": 0,
+    "claims_reused": 0,
+    "reranked_results_dropped": 0,
+    "rerank_tokens_saved": 0,
+}
+
+# Run-wide registry so each distinct claim is searched and validated once
+registry = FactRegistry()
+# "run" shares claims across QA pairs; "pair" only within each pair, so which pair searches and validates a
+# claim does not depend on the order concurrent pairs reach each stage (used for cassette record/replay)
+CLAIM_SCOPE = os.getenv("CLAIM_SCOPE", "run")
+
+# Event loop reused by process_pair across pairs, so searches keep the shared client's connections
+_serial_loop = None
+
+ERROR_RESULT = {"verdict": "Error", "reasoning": "Validation of the shared claim failed", "supporting_urls": []}
+
+
+def run_serial(coro):
+    """
+    Run a coroutine on the event loop kept for sequential mode, creating it on first use.
+    """
+    global _serial_loop
+    if _serial_loop is None or _serial_loop.is_closed():
+        _serial_loop = asyncio.new_event_loop()
+    return _serial_loop.run_until_complete(coro)
+
+
+def close_serial_loop():
+    """
+    Close the sequential-mode event loop and its search client.
+    """
+    if _serial_loop is not None and not _serial_loop.is_closed():
+        _serial_loop.run_until_complete(close_async_search_client())
+        _serial_loop.close()
+
+
+def load_qa_pairs(path="qa_pairs.json"):
     # Read QA pairs from the local project file
-    with open("qa_pairs.json", "r", encoding="utf-8") as f:
+    with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
+    return data.get("qa_pairs", [])
+
+
+def pair_registry():
+    """
+    Claim registry for one QA pair: the run-wide one, or a fresh one (sharing its stats) with CLAIM_SCOPE="pair".
+    """
+    if CLAIM_SCOPE == "pair":
+        return FactRegistry(stats=registry.stats)
+    return registry
+
+
+async def search_claims(facts, n_results, claims):
+    """
+    Search the evidence provider for distinct claims only: facts that repeat (or nearly repeat) a claim already
+    searched in this run reuse its evidence, or wait for the search already in flight.
+    Returns evidence lists in fact order.
+    """
+    kind = f"evidence:{n_results}"
+    cids = [claims.claim_id(fact) for fact in facts]
+
+    owned = []
+    for cid in dict.fromkeys(cids):
+        if claims.get(kind, cid) is None and claims.inflight(kind, cid) is None:
+            claims.start(kind, cid)
+            owned.append(cid)
+    run_stats["claims_reused"] += len(cids) - len(owned)
+
+    evidence_lists = []
+    try:
+        evidence_lists = await get_evidence_provider().search_many(
+            [claims.representative(cid) for cid in owned], n_results=n_results
+        )
+    finally:
+        for i, cid in enumerate(owned):
+            found = i < len(evidence_lists)
+            claims.finish(kind, cid, evidence_lists[i] if found else [], keep=found)
+
+    results = []
+    for cid in cids:
+        value = claims.get(kind, cid)
+        if value is None:
+            future = claims.inflight(kind, cid)
+            value = await future if future is not None else []
+        results.append(value)
+    return results
+
+
+def plan_validation(to_validate, claims, track_inflight=False):
+    """
+    Pick one fact per distinct claim that has no verdict yet in this run.
+    Returns (fact -> evidence to send to the LLM, fact -> claim id for every fact).
+    """
+    cids = {fact: claims.claim_id(fact) for fact in to_validate}
+    owned = {}
+    owned_cids = set()
+    for fact, cid in cids.items():
+        if cid in owned_cids or claims.get("verdict", cid) is not None or claims.inflight("verdict", cid) is not None:
+            continue
+        if track_inflight:
+            claims.start("verdict", cid)
+        owned[fact] = to_validate[fact]
+        owned_cids.add(cid)
+    run_stats["claims_reused"] += len(cids) - len(owned)
+    return owned, cids
+
+
+def publish_verdicts(owned, cids, validated, claims):
+    for fact in owned:
+        result = validated.get(fact, ERROR_RESULT)
+        claims.finish("verdict", cids[fact], result, keep=result.get("verdict") != "Error")
+
+
+async def collect_verdicts(cids, validated, claims):
+    results = {}
+    for fact, cid in cids.items():
+        value = claims.get("verdict", cid)
+        if value is None:
+            future = claims.inflight("verdict", cid)
+            value = await future if future is not None else validated.get(fact, ERROR_RESULT)
+        results[fact] = value
+    return results
+
+
+async def gather_evidence(facts, claims):
+    """
+    Search evidence for every fact, concurrently and in fact order.
+    Facts below the check-worthiness threshold are skipped or searched with fewer results.
+    Returns (fact -> evidence list, fact -> local result for skipped facts).
+    """
+    if CHECK_WORTHINESS_MODE == "off":
+        evidence_lists = await search_claims(facts, N_RESULTS, claims)
+        return dict(zip(facts, evidence_lists)), {}
+
+    worthy, low = split_check_worthy(facts, CHECK_WORTHINESS_THRESHOLD)
+    run_stats["not_check_worthy"] += len(low)
+
+    skipped = {}
+    if CHECK_WORTHINESS_MODE == "downgrade":
+        evidence_lists, low_lists = await asyncio.gather(
+            search_claims(worthy, N_RESULTS, claims),
+            search_claims(list(low), DOWNGRADED_N_RESULTS, claims),
+        )
+        run_stats["search_results_saved"] += len(low) * (N_RESULTS - DOWNGRADED_N_RESULTS)
+        found = {**dict(zip(worthy, evidence_lists)), **dict(zip(low, low_lists))}
+    else:
+        evidence_lists = await search_claims(worthy, N_RESULTS, claims)
+        run_stats["searches_saved"] += len(low)
+        found = dict(zip(worthy, evidence_lists))
+        skipped = {
+            fact: {
+                "verdict": "Not check-worthy",
+                "reasoning": f"Check-worthiness score {score:.2f} is below {CHECK_WORTHINESS_THRESHOLD:.2f}.",
+                "supporting_urls": [],
+            }
+            for fact, score in low.items()
+        }
+    return {fact: found[fact] for fact in facts if fact in found}, skipped
+
+
+def rerank(evidence_dict):
+    """
+    Keep only the evidence items most relevant to each fact (see evidence.rerank).
+    """
+    if not RERANK_ENABLED:
+        return evidence_dict
+    reranked = {
+        fact: rerank_evidence(fact, evidence_list, RERANK_TOP_K, RERANK_MIN_SCORE)
+        for fact, evidence_list in evidence_dict.items()
+    }
+    dropped = sum(len(evidence_dict[fact]) - len(kept) for fact, kept in reranked.items())
+    if dropped:
+        run_stats["reranked_results_dropped"] += dropped
+        run_stats["rerank_tokens_saved"] += (
+            count_tokens(build_validation_prompt(evidence_dict)) - count_tokens(build_validation_prompt(reranked))
+        )
+    return reranked
+
+
+def split_unevidenced(evidence_dict):
+    """
+    Resolve facts without evidence locally with a "No evidence" verdict.
+    Returns (fact -> evidence for the LLM, fact -> local result).
+    """
+    to_validate = {fact: ev for fact, ev in evidence_dict.items() if ev}
+    local = {fact: dict(NO_EVIDENCE_RESULT) for fact, ev in evidence_dict.items() if not ev}
+
+    run_stats["no_evidence_facts"] += len(local)
+    if local and to_validate:
+        # Tokens these facts would have added to the validation prompt
+        run_stats["prompt_tokens_saved"] += (
+            count_tokens(build_validation_prompt(evidence_dict)) - count_tokens(build_validation_prompt(to_validate))
+        )
+    return to_validate, local
+
+
+def merge_results(facts, *partials):
+    merged = {}
+    for partial in partials:
+        merged.update(partial)
+    return {fact: merged[fact] for fact in facts if fact in merged}
+
+
+def process_pair(answer, facts=None):
+    """
+    Extract, search and validate one answer; pass `facts` if they were already extracted.
+    Returns (facts, evidence_dict, results); facts without evidence never reach the LLM.
+    """
+    # Extract a list of facts (no query mapping)
+    if facts is None:
+        facts = extract_facts(answer)
+    if not facts:
+        return facts, {}, None
 
-    qa_pairs = data.get("qa_pairs", [])
+    # Build evidence dict: fact -> list of evidence items from web search using the fact as the query
+    # All searches for the pair run concurrently; results come back in fact order
+    claims = pair_registry()
+    evidence_dict, skipped = run_serial(gather_evidence(facts, claims))
+    evidence_dict = rerank(evidence_dict)
+
+    # Only facts with evidence, and only one fact per distinct claim, are sent for LLM validation
+    to_validate, local = split_unevidenced(evidence_dict)
+    owned, cids = plan_validation(to_validate, claims)
+    validated = validate_facts_batch(owned) if owned else {}
+    publish_verdicts(owned, cids, validated, claims)
+    shared = run_serial(collect_verdicts(cids, validated, claims))
+    return facts, evidence_dict, merge_results(facts, skipped, local, shared)
+
+
+async def extract_stage(answer):
+    return await asyncio.to_thread(extract_facts, answer)
+
+
+async def search_stage(facts):
+    claims = pair_registry()
+    if not facts:
+        return facts, {}, {}, claims
+    evidence_dict, skipped = await gather_evidence(facts, claims)
+    return facts, rerank(evidence_dict), skipped, claims
+
+
+async def validate_stage(searched):
+    facts, evidence_dict, skipped, claims = searched
+    if not facts:
+        return facts, evidence_dict, None
+    to_validate, local = split_unevidenced(evidence_dict)
+    owned, cids = plan_validation(to_validate, claims, track_inflight=True)
+    validated = {}
+    try:
+        validated = await validate_facts_batch_async(owned) if owned else {}
+    finally:
+        publish_verdicts(owned, cids, validated, claims)
+    shared = await collect_verdicts(cids, validated, claims)
+    return facts, evidence_dict, merge_results(facts, skipped, local, shared)
+
+
+async def process_pair_async(answer, semaphore):
+    """
+    Async counterpart of process_pair; at most `semaphore`'s limit of pairs run at once.
+    """
+    async with semaphore:
+        return await validate_stage(await search_stage(await extract_stage(answer)))
+
+
+def print_pair(idx, qa, facts, results):
+    print(f"\n===== QA Pair {idx} =====")
+    print(f"Q: {qa.get('question', '')}")
+    print(f"A: {qa.get('answer', '')}")
+
+    if not facts:
+        print("No factual statements detected.\n")
+        return
+
+    for fact, result in results.items():
+        print(f"\nFact: {fact}")
+        print(f"Verdict: {result.get('verdict', 'Error')}")
+        print(f"Reasoning: {result.get('reasoning', '')}")
+        su = result.get('supporting_urls') or []
+        if su:
+            print("Supporting Citations:")
+            for url in su:
+                print(f"  - {url}")
+        else:
+            print("No supporting citations.")
+
+
+def print_run_stats():
+    if run_stats["claims_reused"]:
+        print(f"\n{registry.stats['distinct']} distinct claims ({registry.stats['near_duplicates']} near-duplicate "
+              f"phrasings); {run_stats['claims_reused']} searches/validations reused a claim already handled in this run")
+    if run_stats["not_check_worthy"]:
+        print(f"\n{run_stats['not_check_worthy']} facts scored below the check-worthiness threshold "
+              f"({CHECK_WORTHINESS_MODE}): {run_stats['searches_saved']} searches and LLM validations skipped, "
+              f"{run_stats['search_results_saved']} search results trimmed")
+    if run_stats["no_evidence_facts"]:
+        print(f"\nResolved {run_stats['no_evidence_facts']} facts without evidence locally, "
+              f"saving ~{run_stats['prompt_tokens_saved']} LLM prompt tokens")
+    if run_stats["reranked_results_dropped"]:
+        print(f"\nReranking dropped {run_stats['reranked_results_dropped']} off-topic or surplus search results, "
+              f"saving ~{run_stats['rerank_tokens_saved']} LLM prompt tokens")
+    if search_flight.coalesced:
+        print(f"\n{search_flight.coalesced} searches coalesced onto {search_flight.executed} outstanding Tavily requests")
+    throttle, retries = search_rate_limiter.stats(), search_retry_budget.stats()
+    if throttle["waits"] or retries["retries"] or retries["exhausted"]:
+        print(f"\nTavily throttling: {throttle['waits']} waits ({throttle['wait_seconds']:.1f} s), "
+              f"{retries['retries']} retries, {retries['exhausted']} denied by the retry budget")
+    hedges = search_hedger.stats()
+    if hedges["hedged"]:
+        print(f"\n{hedges['hedged']} slow searches hedged after {hedges['delay']:.1f} s, "
+              f"{hedges['hedge_wins']} answered first by the hedge")
+    tape = get_cassette()
+    if tape is not None:
+        stats = tape.stats()
+        print(f"\nCassette {tape.path} ({tape.mode}): {stats['recorded']} recorded, {stats['replayed']} replayed, "
+              f"{stats['missed']} missing, {stats['entries']} entries")
+    caches = (
+        ("Extraction", get_extraction_cache()),
+        ("Evidence", get_evidence_cache()),
+        ("Verdict", get_verdict_cache()),
+        ("Semantic verdict", get_semantic_cache()),
+    )
+    for label, cache in caches:
+        if cache is not None:
+            stats = cache.stats()
+            print(f"\n{label} cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
+
+
+def main():
+    qa_pairs = load_qa_pairs()
     if not qa_pairs:
         print("No QA pairs found in JSON file.")
         return
 
-    for idx, qa in enumerate(qa_pairs, start=1):
-        question = qa.get("question", "")
-        answer = qa.get("answer", "")
+    # Extract facts for every pair up front in one batched LangExtract call
+    try:
+        facts_by_pair = extract_facts_batch([qa.get("answer", "") for qa in qa_pairs])
+    except Exception as e:
+        print(f"Batch extraction failed, extracting per pair: {e}")
+        facts_by_pair = [None] * len(qa_pairs)
 
-        print(f"\n===== QA Pair {idx} =====")
-        print(f"Q: {question}")
-        print(f"A: {answer}")
-
-        # Extract a list of facts (no query mapping)
-        facts = extract_facts(answer)
-        if not facts:
-            print("No factual statements detected.\n")
+    for idx, (qa, pair_facts) in enumerate(zip(qa_pairs, facts_by_pair), start=1):
+        try:
+            facts, _, results = process_pair(qa.get("answer", ""), pair_facts)
+        except Exception as e:
+            print(f"\n===== QA Pair {idx} =====")
+            print(f"Error during validation: {e}")
             continue
+        print_pair(idx, qa, facts, results)
 
-        # Build evidence dict: fact -> list of evidence items from web search using the fact as the query
-        evidence_dict = {}
-        for fact in facts:
-            evidence = google_search(fact, n_results=5)
-            evidence_dict[fact] = evidence
-
-        # Skip LLM validation if no evidence is found for any fact
-        if all(not v for v in evidence_dict.values()):
-            for fact in facts:
-                print(f"\nFact: {fact}")
-                print("Verdict: No evidence")
-                print("Reasoning: No relevant web data found.\n")
-                print("No supporting citations.")
-            continue
+    close_serial_loop()
+    print_run_stats()
+    save_semantic_caches()
+
+
+async def main_async(max_in_flight=MAX_PAIRS_IN_FLIGHT):
+    """
+    Process all QA pairs concurrently, with at most `max_in_flight` pairs in flight.
+    Output is printed in input order as soon as each pair is done.
+    """
+    qa_pairs = load_qa_pairs()
+    if not qa_pairs:
+        print("No QA pairs found in JSON file.")
+        return
+
+    semaphore = asyncio.Semaphore(max(max_in_flight, 1))
+    tasks = [asyncio.create_task(process_pair_async(qa.get("answer", ""), semaphore)) for qa in qa_pairs]
 
+    for idx, (qa, task) in enumerate(zip(qa_pairs, tasks), start=1):
         try:
-            results = validate_facts_batch(evidence_dict)
+            facts, _, results = await task
         except Exception as e:
+            print(f"\n===== QA Pair {idx} =====")
             print(f"Error during validation: {e}")
             continue
+        print_pair(idx, qa, facts, results)
+
+    await close_async_search_client()
+    print_run_stats()
+    save_semantic_caches()
+
+
+async def main_pipeline(
+    extract_workers=EXTRACT_WORKERS,
+    search_workers=SEARCH_WORKERS,
+    validate_workers=VALIDATE_WORKERS,
+    queue_size=PIPELINE_QUEUE_SIZE
+):
+    """
+    Stream QA pairs through extract -> search -> validate stages connected by bounded queues,
+    so one pair is extracted while the previous one is searched and an earlier one validated.
+    """
+    qa_pairs = load_qa_pairs()
+    if not qa_pairs:
+        print("No QA pairs found in JSON file.")
+        return
+
+    def on_result(i, outcome):
+        if isinstance(outcome, Exception):
+            print(f"\n===== QA Pair {i + 1} =====")
+            print(f"Error during validation: {outcome}")
+            return
+        facts, _, results = outcome
+        print_pair(i + 1, qa_pairs[i], facts, results)
+
+    stages = [
+        Stage("extract", extract_stage, extract_workers),
+        Stage("search", search_stage, search_workers),
+        Stage("validate", validate_stage, validate_workers),
+    ]
+    answers = [qa.get("answer", "") for qa in qa_pairs]
+    stats = await run_pipeline(answers, stages, on_result=on_result, queue_size=queue_size)
+    await close_async_search_client()
+
+    print_run_stats()
+    save_semantic_caches()
+    print(f"\nPipeline: {stats['items']} QA pairs in {stats['elapsed_seconds']:.1f}s "
+          f"({stats['items_per_minute']:.1f} pairs/min)")
+    for name, stage in stats["stages"].items():
+        print(f"  {name}: {stage['workers']} workers, {stage['processed']} pairs, {stage['busy_seconds']:.1f}s busy")
 
-        for fact, result in results.items():
-            print(f"\nFact: {fact}")
-            print(f"Verdict: {result.get('verdict', 'Error')}")
-            print(f"Reasoning: {result.get('reasoning', '')}")
-            su = result.get('supporting_urls') or []
-            if su:
-                print("Supporting Citations:")
-                for url in su:
-                    print(f"  - {url}")
-            else:
-                print("No supporting citations.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Extract and validate facts from qa_pairs.json")
+    parser.add_argument("--concurrent", action="store_true", help="process QA pairs concurrently")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_PAIRS_IN_FLIGHT,
+                        help="max QA pairs in flight with --concurrent")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="stream QA pairs through extract/search/validate stages")
+    parser.add_argument("--extract-workers", type=int, default=EXTRACT_WORKERS)
+    parser.add_argument("--search-workers", type=int, default=SEARCH_WORKERS)
+    parser.add_argument("--validate-workers", type=int, default=VALIDATE_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=PIPELINE_QUEUE_SIZE,
+                        help="max QA pairs waiting between two pipeline stages")
+    parser.add_argument("--check-worthiness", choices=("skip", "downgrade", "off"), default=CHECK_WORTHINESS_MODE,
+                        help="how to treat facts below the check-worthiness threshold")
+    parser.add_argument("--check-threshold", type=float, default=CHECK_WORTHINESS_THRESHOLD)
+    parser.add_argument("--evidence", choices=("tavily", "local"), default=EVIDENCE_PROVIDER,
+                        help="search the web (Tavily) or a local BM25 corpus for evidence")
+    parser.add_argument("--corpus", default=EVIDENCE_CORPUS_DIR,
+                        help="directory of .txt/.md/.jsonl documents for --evidence local")
+    parser.add_argument("--rerank-top-k", type=int, default=RERANK_TOP_K,
+                        help="evidence items kept per fact after reranking (0 keeps all)")
+    parser.add_argument("--rerank-min-score", type=float, default=RERANK_MIN_SCORE)
+    parser.add_argument("--record", metavar="CASSETTE", help="record every search/extraction/validation call")
+    parser.add_argument("--replay", metavar="CASSETTE", help="replay a recorded run offline")
+    parser.add_argument("--latency-scale", type=float, default=CASSETTE_LATENCY_SCALE,
+                        help="with --replay, sleep for recorded latency times this factor (0 = instant)")
+    args = parser.parse_args()
+    CHECK_WORTHINESS_MODE = args.check_worthiness
+    CHECK_WORTHINESS_THRESHOLD = args.check_threshold
+    set_evidence_provider(build_evidence_provider(args.evidence, args.corpus))
+    RERANK_ENABLED = RERANK_ENABLED and args.rerank_top_k > 0
+    RERANK_TOP_K, RERANK_MIN_SCORE = args.rerank_top_k, args.rerank_min_score
+    if args.record or args.replay:
+        set_cassette(Cassette(args.record or args.replay, "record" if args.record else "replay", args.latency_scale))
+        # Every call must reach the cassette, so the run is complete when recorded and identical when replayed
+        set_extraction_cache(None)
+        set_evidence_cache(None)
+        set_verdict_cache(None)
+        validation_and_reasoning.SEMANTIC_CACHE_ENABLED = False
+        # Same calls in every mode, so a serial recording replays with --concurrent/--pipeline and vice versa
+        CLAIM_SCOPE = "pair"
+
+    if args.pipeline:
+        asyncio.run(main_pipeline(args.extract_workers, args.search_workers, args.validate_workers, args.queue_size))
+    elif args.concurrent:
+        asyncio.run(main_async(args.max_in_flight))
+    else:
+        main()
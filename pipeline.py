@@ -0,0 +1,104 @@
+import time
+import asyncio
+
+# Sentinel pushed through the queues once all items have been fed
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline stage: an async function applied to every item by `workers` concurrent workers.
+    """
+
+    def __init__(self, name, func, workers=1):
+        self.name = name
+        self.func = func
+        self.workers = max(int(workers), 1)
+        self.processed = 0
+        self.busy_seconds = 0.0
+
+
+async def _stage_worker(stage, inbox, outbox):
+    while True:
+        entry = await inbox.get()
+        if entry is _DONE:
+            # Let sibling workers see the sentinel too
+            await inbox.put(_DONE)
+            return
+        idx, value = entry
+        # Failed items skip the remaining stages and are reported as the exception
+        if not isinstance(value, Exception):
+            start = time.perf_counter()
+            try:
+                value = await stage.func(value)
+            except Exception as e:
+                value = e
+            stage.busy_seconds += time.perf_counter() - start
+            stage.processed += 1
+        await outbox.put((idx, value))
+
+
+async def run_pipeline(items, stages, on_result=None, queue_size=4):
+    """
+    Stream `items` through `stages`, each connected to the next by a bounded queue,
+    so item N+1 can be in an early stage while item N is in a later one.
+    `on_result(idx, value)` is called in input order as soon as each item is done;
+    value is the exception instead if a stage raised.
+    Returns a stats dict with elapsed time, throughput and per-stage worker/busy figures.
+    """
+    queues = [asyncio.Queue(maxsize=max(queue_size, 1)) for _ in range(len(stages) + 1)]
+    start = time.perf_counter()
+
+    worker_groups = []
+    for stage, inbox, outbox in zip(stages, queues, queues[1:]):
+        worker_groups.append([
+            asyncio.create_task(_stage_worker(stage, inbox, outbox)) for _ in range(stage.workers)
+        ])
+
+    async def _feed():
+        for idx, item in enumerate(items):
+            await queues[0].put((idx, item))
+        await queues[0].put(_DONE)
+
+    async def _shutdown():
+        # Close each stage in turn once all of its workers have drained their inbox
+        for group, outbox in zip(worker_groups, queues[1:]):
+            await asyncio.gather(*group)
+            await outbox.put(_DONE)
+
+    feeder = asyncio.create_task(_feed())
+    closer = asyncio.create_task(_shutdown())
+
+    # Re-order finished items so callers see them in input order
+    pending, next_idx, completed = {}, 0, 0
+    sink = queues[-1]
+    while True:
+        entry = await sink.get()
+        if entry is _DONE:
+            break
+        idx, value = entry
+        pending[idx] = value
+        while next_idx in pending:
+            if on_result is not None:
+                on_result(next_idx, pending.pop(next_idx))
+            else:
+                pending.pop(next_idx)
+            next_idx += 1
+            completed += 1
+
+    await asyncio.gather(feeder, closer)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "items": completed,
+        "elapsed_seconds": elapsed,
+        "items_per_minute": completed * 60 / elapsed if elapsed else 0.0,
+        "stages": {
+            stage.name: {
+                "workers": stage.workers,
+                "processed": stage.processed,
+                "busy_seconds": stage.busy_seconds,
+            }
+            for stage in stages
+        },
+    }
@@ -0,0 +1,191 @@
+import os
+import re
+import json
+import math
+import zlib
+import threading
+import numpy as np
+
+SEMANTIC_CACHE_PATH = os.getenv("SEMANTIC_CACHE_PATH", os.path.join(".cache", "semantic_verdicts.npz"))
+# Cosine similarity above which a cached verdict is reused for a paraphrased fact
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.8"))
+VECTOR_DIM = 256
+DF_BUCKETS = 2 ** 20
+
+_WORD_RE = re.compile(r"[a-z]+|\d+(?:\.\d+)?%?")
+_PERCENT_RE = re.compile(r"(\d)\s*(?:%|per\s*cent\b|percent\b)")
+_ANCHOR_RE = re.compile(r"\b(?:[A-Z][A-Za-z]*|\d+(?:\.\d+)?|[a-z]+)")
+_STOPWORDS = frozenset(
+    "a an the of in on at to for by with and or is are was were be been has have had its it this that as from "
+    "than about into according per year".split()
+)
+# Comparatives and negations are folded together and treated as anchors, so a verdict for
+# "over 96%" never serves "below 96%"
+_SYNONYMS = {"above": "over", "exceeds": "over", "more": "over", "below": "under", "less": "under", "never": "not"}
+_POLARITY = frozenset({"over", "under", "not", "no"})
+BIGRAM_WEIGHT = 0.5
+
+
+def anchor_tokens(text):
+    """
+    Numbers, capitalized words and comparatives/negations of a fact in order, which must match exactly
+    for a verdict to be reused.
+    Thousands separators and trailing decimal zeros are dropped; the first non-stopword only counts if it
+    is a number or an acronym, since any word is capitalized at the start of a sentence.
+    """
+    cleaned = re.sub(r"(?<=\d),(?=\d{3}\b)", "", str(text))
+    first = next((w for w in re.findall(r"[A-Za-z]+|\d+", cleaned) if w.casefold() not in _STOPWORDS), None)
+    anchors = []
+    for token in _ANCHOR_RE.findall(cleaned):
+        if token.casefold() in _STOPWORDS:
+            continue
+        if token.islower():
+            token = _SYNONYMS.get(token, token)
+            if token in _POLARITY:
+                anchors.append(token)
+            continue
+        if token == first and token.isalpha() and not token.isupper():
+            first = None
+            continue
+        first = None
+        if token[0].isdigit():
+            anchors.append(token.rstrip("0").rstrip(".") if "." in token else token)
+        else:
+            anchors.append(token.casefold())
+    return tuple(anchors)
+
+
+def _terms(text):
+    """
+    Weighted terms of a fact: truncated-word unigrams plus down-weighted bigrams (to keep word order).
+    """
+    text = _PERCENT_RE.sub(r"\1%", str(text).casefold())
+    words = [_SYNONYMS.get(w, w) for w in _WORD_RE.findall(text) if w not in _STOPWORDS]
+    # Crude suffix folding so "literacy"/"literate" and "enacted"/"enactment" collide
+    stems = [w[:6] if w.isalpha() else w for w in words]
+    return [(w, 1.0) for w in stems] + [(f"{a} {b}", BIGRAM_WEIGHT) for a, b in zip(stems, stems[1:])]
+
+
+class SemanticVerdictCache:
+    """
+    Offline semantic cache of verdicts.
+    Facts are embedded as signed, hashed TF-IDF vectors (unigrams + bigrams) in a float32 matrix;
+    a verdict is reused only when both facts have the same anchor tokens (numbers and named
+    entities) and their cosine similarity clears the threshold.
+    """
+
+    def __init__(self, path=None, threshold=SEMANTIC_CACHE_THRESHOLD, namespace="", dim=VECTOR_DIM):
+        self.path = path
+        self.threshold = threshold
+        self.namespace = namespace
+        self.dim = dim
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._matrix = np.zeros((1024, dim), dtype=np.float32)
+        self._size = 0
+        self._df = np.zeros(DF_BUCKETS, dtype=np.int32)
+        self._docs = 0
+        self._facts = []
+        self._groups = {}  # anchor tokens -> row indices
+        self._verdicts = []
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def _embed(self, text, update_df=False):
+        counts, weights = {}, {}
+        for term, weight in _terms(text):
+            h = zlib.crc32(term.encode("utf-8"))
+            counts[h] = counts.get(h, 0) + 1
+            weights[h] = weight
+        if update_df:
+            self._docs += 1
+            for h in counts:
+                self._df[h % DF_BUCKETS] += 1
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for h, tf in counts.items():
+            idf = math.log((1 + self._docs) / (1 + self._df[h % DF_BUCKETS])) + 1.0
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            vector[h % self.dim] += sign * weights[h] * (1.0 + math.log(tf)) * idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, fact):
+        """
+        Return the cached verdict for a paraphrase of `fact`, or None.
+        Only rows with the same anchor tokens are scored, so lookups stay fast as the cache grows.
+        """
+        with self._lock:
+            rows = self._groups.get(anchor_tokens(fact))
+            if not rows:
+                self.misses += 1
+                return None
+            scores = self._matrix[rows] @ self._embed(fact)
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._verdicts[rows[best]]
+
+    def add(self, fact, verdict):
+        """
+        Store a verdict for `fact`.
+        """
+        with self._lock:
+            vector = self._embed(fact, update_df=True)
+            if self._size == len(self._matrix):
+                grown = np.zeros((len(self._matrix) * 2, self.dim), dtype=np.float32)
+                grown[:self._size] = self._matrix[:self._size]
+                self._matrix = grown
+            self._matrix[self._size] = vector
+            self._groups.setdefault(anchor_tokens(fact), []).append(self._size)
+            self._size += 1
+            self._facts.append(str(fact))
+            self._verdicts.append(verdict)
+
+    def __len__(self):
+        return self._size
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": self._size}
+
+    def save(self, path=None):
+        """
+        Persist vectors, document frequencies and verdicts to a compressed .npz file.
+        """
+        path = path or self.path
+        if not path:
+            return
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            meta = json.dumps({
+                "namespace": self.namespace,
+                "docs": self._docs,
+                "facts": self._facts,
+                "verdicts": self._verdicts,
+            }, ensure_ascii=False)
+            with open(path, "wb") as f:
+                np.savez_compressed(f, matrix=self._matrix[:self._size], df=self._df, meta=np.array(meta))
+
+    def _load(self, path):
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("namespace") != self.namespace or data["matrix"].shape[1] != self.dim:
+                    # Different model/prompt version or vector size: start empty
+                    return
+                matrix = data["matrix"]
+                self._df = data["df"].astype(np.int32)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable semantic cache {path}: {e}")
+            return
+        self._size = len(matrix)
+        self._matrix = np.zeros((max(1024, self._size * 2), self.dim), dtype=np.float32)
+        self._matrix[:self._size] = matrix
+        self._docs = meta["docs"]
+        self._facts = meta["facts"]
+        self._verdicts = meta["verdicts"]
+        for i, fact in enumerate(self._facts):
+            self._groups.setdefault(anchor_tokens(fact), []).append(i)
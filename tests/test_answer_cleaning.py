@@ -0,0 +1,43 @@
+from answer_cleaning import clean_answer
+
+
+def test_inline_annotations_keep_their_words():
+    # qa_pairs.json pair 19: "slums" and "urbanisation" also appear later in the answer
+    answer = (
+        "Rising [UNDERLINED: skyscrapers] on one end and [UNDERLINED: slums] at the other represents "
+        "the dichotomy of Indian cities in this era of [UNDERLINED: urbanisation]  \n\n"
+        "- Migrants settle in slums on the urban fringe  \n"
+        "- Rapid urbanisation without planning  \n"
+    )
+    cleaned = clean_answer(answer)
+    assert cleaned.startswith(
+        "Rising skyscrapers on one end and slums at the other represents "
+        "the dichotomy of Indian cities in this era of urbanisation\n"
+    )
+
+
+def test_boxed_phrase_mid_sentence_is_kept():
+    # qa_pairs.json pair 15: "volcanic cone" also appears elsewhere in the answer
+    answer = (
+        "3. Lava cools around the vent into a volcanic cone  \n"
+        "4. Development of various volcanic layers, forming [BOX: volcanic cone] add to the "
+        "[UNDERLINED: natural beauty]  \n"
+        "6. Eruptions at regular intervals, adding to the [UNDERLINED: natural beauty].  \n"
+    )
+    cleaned = clean_answer(answer)
+    assert "4. Development of various volcanic layers, forming volcanic cone add to the natural beauty\n" in cleaned
+    assert cleaned.endswith("adding to the natural beauty.")
+
+
+def test_annotation_repeating_the_next_line_is_dropped():
+    answer = "Intro line  \n[UNDERLINED: Economic cost]  \nEconomic cost of the green transition is high  \n"
+    assert clean_answer(answer) == "Intro line\n\nEconomic cost of the green transition is high"
+
+
+def test_heading_annotation_is_unwrapped():
+    answer = "Intro line  \n[BOX: Social costs]  \n1) Livelihoods are impacted  \n"
+    assert clean_answer(answer) == "Intro line\nSocial costs\n1) Livelihoods are impacted"
+
+
+def test_crossed_out_annotation_is_dropped():
+    assert clean_answer("India has [CROSSED: 29] 28 states") == "India has 28 states"
@@ -0,0 +1,44 @@
+from fact_registry import FactRegistry
+
+
+def test_near_duplicates_share_a_claim():
+    registry = FactRegistry()
+    first = registry.claim_id("India became a member of the MTCR in 2016.")
+    assert registry.claim_id("India became member of the MTCR in 2016") == first
+
+
+def test_negated_facts_are_separate_claims():
+    registry = FactRegistry()
+    member = registry.claim_id("India is a member of the Nuclear Suppliers Group")
+    assert registry.claim_id("India is not a member of the Nuclear Suppliers Group") != member
+    assert registry.claim_id("India isn't a member of the Nuclear Suppliers Group") != member
+
+    enacted = registry.claim_id("The Forest Rights Act was enacted in 2006")
+    assert registry.claim_id("The Forest Rights Act was not enacted in 2006") != enacted
+
+
+def test_different_entities_are_separate_claims():
+    registry = FactRegistry()
+    india = registry.claim_id("India became a member of the MTCR in 2016")
+    assert registry.claim_id("Pakistan became a member of the MTCR in 2016") != india
+
+
+def test_opposite_directions_are_separate_claims():
+    pairs = [
+        ("Forest cover in India has increased since 2019", "Forest cover in India has decreased since 2019"),
+        ("Urban population increased between 2001 and 2011", "Urban population decreased between 2001 and 2011"),
+        ("India's renewable energy share rose to 40% in 2023", "India's renewable energy share fell to 40% in 2023"),
+        ("Kerala has the highest literacy rate in India as per Census 2011",
+         "Kerala has the lowest literacy rate in India as per Census 2011"),
+        ("India is the largest producer of milk in the world", "India is the smallest producer of milk in the world"),
+    ]
+    for first, second in pairs:
+        registry = FactRegistry()
+        assert registry.claim_id(first) != registry.claim_id(second), (first, second)
+
+
+def test_same_direction_paraphrase_shares_a_claim():
+    registry = FactRegistry()
+    first = registry.claim_id("Forest cover in India has increased since 2019")
+    assert registry.claim_id("Forest cover in India has increased since 2019.") == first
+    assert registry.claim_id("Forest cover of India has increased since 2019") == first
@@ -0,0 +1,52 @@
+import json
+
+from validation_and_reasoning import _failed_facts, parse_validation_response
+
+FACTS = {
+    "India became a member of the MTCR in 2016": [{"title": "MTCR", "snippet": "...", "url": "https://example.org/mtcr"}],
+    "The Forest Rights Act was enacted in 2006": [{"title": "FRA", "snippet": "...", "url": "https://example.org/fra"}],
+}
+
+
+def test_cited_evidence_maps_to_urls():
+    msg = json.dumps({
+        "fact_1": {"verdict": "Supported", "reasoning": "Joined in 2016", "cited_evidence": ["EVIDENCE 1.1"]},
+        "fact_2": {"verdict": "Supported", "reasoning": "Enacted in 2006", "cited_evidence": []},
+    })
+    results = parse_validation_response(FACTS, msg)
+    assert results["India became a member of the MTCR in 2016"]["supporting_urls"] == ["https://example.org/mtcr"]
+    assert not _failed_facts(FACTS, results)
+
+
+def test_malformed_fact_entry_is_an_error_and_retried():
+    msg = json.dumps({"fact_1": "Supported", "fact_2": {"verdict": "Refuted", "cited_evidence": None}})
+    results = parse_validation_response(FACTS, msg)
+    assert results["India became a member of the MTCR in 2016"]["verdict"] == "Error"
+    assert results["The Forest Rights Act was enacted in 2006"]["verdict"] == "Refuted"
+    assert list(_failed_facts(FACTS, results)) == ["India became a member of the MTCR in 2016"]
+
+
+def test_non_object_response_fails_every_fact():
+    results = parse_validation_response(FACTS, '[{"verdict": "Supported"}]')
+    assert {r["verdict"] for r in results.values()} == {"Error"}
+    assert _failed_facts(FACTS, results) == FACTS
+
+
+def test_set_llm_verdicts_are_not_cached_for_the_azure_deployment(tmp_path, monkeypatch):
+    import validation_and_reasoning
+    from evidence.cache import EvidenceCache
+    from fake_llm import FakeChatModel
+
+    monkeypatch.setattr(validation_and_reasoning, "SEMANTIC_CACHE_ENABLED", False)
+    cache = EvidenceCache(str(tmp_path / "verdicts.sqlite"), table="verdicts")
+    previous_cache = validation_and_reasoning.set_verdict_cache(cache)
+    previous_llm = validation_and_reasoning.set_llm(FakeChatModel())
+    try:
+        validation_and_reasoning.validate_facts_batch(FACTS)
+    finally:
+        validation_and_reasoning.set_llm(previous_llm)
+        validation_and_reasoning.set_verdict_cache(previous_cache)
+
+    for fact, evidence_list in FACTS.items():
+        assert cache.get(validation_and_reasoning.make_verdict_key(fact, evidence_list, "o4-mini")) is None
+        assert cache.get(validation_and_reasoning.make_verdict_key(fact, evidence_list, "fake-o4-mini")) is not None
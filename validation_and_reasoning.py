@@ -1,10 +1,226 @@
 import os
 import json
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from langchain_openai import AzureChatOpenAI
+from evidence.cache import EvidenceCache, normalize_query
+from semantic_cache import SemanticVerdictCache, SEMANTIC_CACHE_PATH
+import cassette
 
 load_dotenv()
 
+# Shared chat clients, keyed by (endpoint, deployment, api_version, api_key)
+_llm_clients = {}
+_llm_clients_lock = threading.Lock()
+# Chat model returned by get_llm instead of an Azure client (e.g. fake_llm.FakeChatModel); see set_llm
+_llm_override = None
+
+# Token budgets for one validation call; larger fact sets are split into sub-batches
+MAX_PROMPT_TOKENS = int(os.getenv("VALIDATION_MAX_PROMPT_TOKENS", "12000"))
+MAX_OUTPUT_TOKENS = int(os.getenv("VALIDATION_MAX_OUTPUT_TOKENS", "3000"))
+OUTPUT_TOKENS_PER_FACT = int(os.getenv("VALIDATION_OUTPUT_TOKENS_PER_FACT", "150"))
+# Max sub-batches validated at once
+MAX_BATCH_CONCURRENCY = int(os.getenv("VALIDATION_MAX_BATCH_CONCURRENCY", "4"))
+# Follow-up calls allowed per sub-batch for facts the LLM dropped or failed on
+MAX_RETRIES = int(os.getenv("VALIDATION_MAX_RETRIES", "2"))
+
+# Bump whenever the prompt template or serialization changes so cached verdicts are not reused
+PROMPT_VERSION = "2"
+
+# Persistent verdict cache; set VERDICT_CACHE=0 to always ask the LLM
+VERDICT_CACHE_ENABLED = os.getenv("VERDICT_CACHE", "1") != "0"
+VERDICT_CACHE_PATH = os.getenv("VERDICT_CACHE_PATH", os.path.join(".cache", "verdicts.sqlite"))
+VERDICT_CACHE_TTL = float(os.getenv("VERDICT_CACHE_TTL", str(30 * 24 * 3600)))  # seconds
+
+# Reuse verdicts for paraphrased facts (see semantic_cache.py); set SEMANTIC_CACHE=1 to enable
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "0") == "1"
+
+_encoding = None
+_verdict_cache = None
+_verdict_cache_lock = threading.Lock()
+_semantic_caches = {}  # deployment name -> SemanticVerdictCache
+
+
+def get_llm(
+    azure_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+    deployment_name="o4-mini",
+    api_version="2024-12-01-preview"
+):
+    """
+    Return a cached AzureChatOpenAI client for the given endpoint/deployment/api_version.
+    The client is built once and its connection pool reused; it is safe to share across threads and asyncio tasks.
+    """
+    if _llm_override is not None:
+        return _llm_override
+    active = cassette.get_cassette()
+    if active is not None and active.mode == "replay":
+        return cassette.ReplayOnlyModel(deployment_name)
+    key = (azure_endpoint, deployment_name, api_version, azure_api_key)
+    llm = _llm_clients.get(key)
+    if llm is None:
+        with _llm_clients_lock:
+            llm = _llm_clients.get(key)
+            if llm is None:
+                llm = AzureChatOpenAI(
+                    azure_endpoint=azure_endpoint,
+                    api_key=azure_api_key,
+                    azure_deployment=deployment_name,
+                    api_version=api_version
+                )
+                _llm_clients[key] = llm
+    return llm
+
+
+def set_llm(llm):
+    """
+    Make get_llm return `llm` (anything with invoke/ainvoke) for every deployment; pass None to
+    go back to Azure clients. Returns the previous override.
+    """
+    global _llm_override
+    with _llm_clients_lock:
+        previous, _llm_override = _llm_override, llm
+    return previous
+
+
+def get_verdict_cache():
+    """
+    Return the module-level verdict cache, opening it on first use.
+    Returns None when caching is disabled.
+    """
+    global _verdict_cache
+    if _verdict_cache is None and VERDICT_CACHE_ENABLED:
+        with _verdict_cache_lock:
+            if _verdict_cache is None:
+                _verdict_cache = EvidenceCache(VERDICT_CACHE_PATH, ttl=VERDICT_CACHE_TTL, table="verdicts")
+    return _verdict_cache
+
+
+def set_verdict_cache(cache):
+    """
+    Replace the module-level verdict cache; pass None to disable caching.
+    Returns the previous cache, which is not closed.
+    """
+    global _verdict_cache, VERDICT_CACHE_ENABLED
+    with _verdict_cache_lock:
+        previous, _verdict_cache = _verdict_cache, cache
+        VERDICT_CACHE_ENABLED = cache is not None
+    return previous
+
+
+def get_semantic_cache(deployment_name="o4-mini"):
+    """
+    Return the semantic verdict cache for a deployment, loading it from disk on first use.
+    Returns None when the semantic cache is disabled.
+    """
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+    cache = _semantic_caches.get(deployment_name)
+    if cache is None:
+        with _verdict_cache_lock:
+            cache = _semantic_caches.get(deployment_name)
+            if cache is None:
+                root, ext = os.path.splitext(SEMANTIC_CACHE_PATH)
+                cache = SemanticVerdictCache(
+                    f"{root}.{deployment_name}{ext}", namespace=f"{deployment_name}:{PROMPT_VERSION}"
+                )
+                _semantic_caches[deployment_name] = cache
+    return cache
+
+
+def save_semantic_caches():
+    """
+    Persist every semantic verdict cache opened in this process.
+    """
+    for cache in list(_semantic_caches.values()):
+        cache.save()
+
+
+def evidence_fingerprint(evidence_list):
+    """
+    SHA-256 over the URLs and snippets of an evidence list, in order.
+    """
+    digest = hashlib.sha256()
+    for ev in evidence_list:
+        _, snippet, url = _evidence_fields(ev)
+        digest.update(f"{url}\x1f{snippet}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def make_verdict_key(fact, evidence_list, deployment_name):
+    """
+    Cache key for a verdict: normalized fact text, evidence fingerprint, deployment and prompt version.
+    """
+    raw = json.dumps([normalize_query(fact), evidence_fingerprint(evidence_list), deployment_name, PROMPT_VERSION])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _cache_model(deployment_name):
+    # Name verdicts are cached under: an override set with set_llm (e.g. FakeChatModel) uses its own
+    # deployment_name, and None (no caching) when it has none, so its verdicts never pass for Azure's
+    override = _llm_override
+    if override is None:
+        return deployment_name
+    return getattr(override, "deployment_name", None)
+
+
+def _lookup_verdicts(facts_evidence_dict, deployment_name):
+    # Returns (cached results, uncached fact -> evidence, fact -> key)
+    if deployment_name is None:
+        return {}, facts_evidence_dict, {}
+    cache = get_verdict_cache()
+    semantic = get_semantic_cache(deployment_name)
+    if cache is None and semantic is None:
+        return {}, facts_evidence_dict, {}
+    cached, uncached, keys = {}, {}, {}
+    for fact, evidence_list in facts_evidence_dict.items():
+        hit = None
+        if cache is not None:
+            keys[fact] = make_verdict_key(fact, evidence_list, deployment_name)
+            hit = cache.get(keys[fact])
+        if hit is None and semantic is not None:
+            hit = semantic.lookup(fact)
+        if hit is not None:
+            cached[fact] = hit
+        else:
+            uncached[fact] = evidence_list
+    return cached, uncached, keys
+
+
+def _store_verdicts(results, keys, deployment_name):
+    if deployment_name is None:
+        return
+    cache = get_verdict_cache()
+    semantic = get_semantic_cache(deployment_name)
+    for fact, result in results.items():
+        if result.get("verdict") == "Error":
+            continue
+        if cache is not None and fact in keys:
+            cache.set(keys[fact], result)
+        if semantic is not None:
+            semantic.add(fact, result)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count prompt tokens with the o200k_base tokenizer used by o-series models.
+    Falls back to a ~4 characters per token estimate when tiktoken or its vocabulary is unavailable.
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            _encoding = False
+            print(f"Warning: tiktoken o200k_base unavailable ({type(e).__name__}); token budgets use a ~4 chars/token estimate")
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
 
 def extract_json_from_response(msg: str):
     """
@@ -38,48 +254,44 @@ def extract_json_from_response(msg: str):
         return None
 
 
-def validate_facts_batch(
-    facts_evidence_dict,
-    azure_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-    deployment_name="o4-mini",
-    api_version="2024-12-01-preview"
-):
+def _evidence_fields(ev):
     """
-    Batch fact-checking using Azure OpenAI.
-    Returns a dict mapping each fact to its verdict, reasoning, and supporting URLs.
+    Normalize an evidence item (dict, (title, snippet, url) sequence, or anything else) to a tuple.
     """
+    if isinstance(ev, dict):
+        return ev.get("title", ""), ev.get("snippet", ""), ev.get("url", "")
+    if isinstance(ev, (list, tuple)) and len(ev) >= 3:
+        return ev[0], ev[1], ev[2]
+    return str(ev), str(ev), str(ev)
 
-    llm = AzureChatOpenAI(
-        azure_endpoint=azure_endpoint,
-        api_key=azure_api_key,
-        azure_deployment=deployment_name,
-        api_version=api_version
-    )
 
-    # ----- Build the structured multi-fact prompt -----
-    facts_text = []
+def _compact(text):
+    return " ".join(str(text).split())
+
+
+def serialize_facts_evidence(facts_evidence_dict):
+    """
+    Render facts and their evidence as compact plain text for the validation prompt.
+    One header line per fact, then per evidence item a citation line with title and URL
+    followed by the whitespace-collapsed snippet.
+    """
+    blocks = []
     for idx, (fact, evidence_list) in enumerate(facts_evidence_dict.items(), 1):
-        fact_block = f"\n{'='*80}\nFACT #{idx}: {fact}\n{'='*80}\n"
-        evidence_blocks = []
+        lines = [f"FACT {idx}: {_compact(fact)}"]
         for i, ev in enumerate(evidence_list, 1):
-            if isinstance(ev, dict):
-                title = ev.get("title", "")
-                snippet = ev.get("snippet", "")
-                url = ev.get("url", "")
-            elif isinstance(ev, (list, tuple)) and len(ev) >= 3:
-                title, snippet, url = ev[0], ev[1], ev[2]
-            else:
-                title = snippet = url = str(ev)
-
-            evidence_blocks.append(
-                f"  EVIDENCE {idx}.{i}:\n"
-                f"    Title: {title}\n"
-                f"    Snippet: {snippet}\n"
-                f"    URL: {url}\n"
-            )
-        fact_block += "\n".join(evidence_blocks)
-        facts_text.append(fact_block)
+            title, snippet, url = _evidence_fields(ev)
+            lines.append(f"EVIDENCE {idx}.{i}: {_compact(title)} ({url})")
+            lines.append(_compact(snippet))
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def build_validation_prompt(facts_evidence_dict):
+    """
+    Build the multi-fact validation prompt for a fact -> evidence list mapping.
+    """
+    # ----- Build the structured multi-fact prompt -----
+    facts_text = serialize_facts_evidence(facts_evidence_dict)
 
     prompt = f"""
 You are an expert fact-checking assistant for UPSC current affairs.
@@ -99,14 +311,17 @@ Here are the facts and evidence:
 
 Return ONLY the single JSON object.
 """
+    return prompt
 
-    # ----- Invoke LLM -----
-    response = llm.invoke(prompt)
-    msg = response.content.strip() if hasattr(response, "content") else str(response)
 
+def parse_validation_response(facts_evidence_dict, msg):
+    """
+    Parse the raw LLM response and map cited evidence back to URLs.
+    Returns a dict mapping each fact to its verdict, reasoning, and supporting URLs.
+    """
     # ----- Parse JSON -----
     llm_results = extract_json_from_response(msg)
-    if llm_results is None:
+    if not isinstance(llm_results, dict):
         return {
             fact: {"verdict": "Error", "reasoning": "Failed to parse LLM response", "supporting_urls": []}
             for fact in facts_evidence_dict
@@ -118,7 +333,7 @@ Return ONLY the single JSON object.
 
     for idx, (fact, evidence_list) in enumerate(facts_indexed, 1):
         key = f"fact_{idx}"
-        if key not in llm_results:
+        if not isinstance(llm_results.get(key), dict):
             results[fact] = {
                 "verdict": "Error",
                 "reasoning": "No output from LLM",
@@ -129,7 +344,9 @@ Return ONLY the single JSON object.
         llm_fact = llm_results[key]
         verdict = llm_fact.get("verdict", "Uncertain")
         reasoning = llm_fact.get("reasoning", "")
-        cited = llm_fact.get("cited_evidence", [])
+        cited = llm_fact.get("cited_evidence") or []
+        if not isinstance(cited, list):
+            cited = [cited]
 
         supporting_urls = []
         for citation in cited:
@@ -149,12 +366,229 @@ Return ONLY the single JSON object.
         results[fact] = {
             "verdict": verdict,
             "reasoning": reasoning,
-            "supporting_urls": list(set(supporting_urls))
+            "supporting_urls": list(dict.fromkeys(supporting_urls))
         }
 
     return results
 
 
+def split_facts_evidence(
+    facts_evidence_dict,
+    max_prompt_tokens=MAX_PROMPT_TOKENS,
+    max_output_tokens=MAX_OUTPUT_TOKENS,
+    output_tokens_per_fact=OUTPUT_TOKENS_PER_FACT
+):
+    """
+    Split a fact -> evidence mapping into sub-batches whose prompt stays under max_prompt_tokens
+    and whose expected JSON output stays under max_output_tokens.
+    A single fact that exceeds the prompt budget on its own gets a batch of its own.
+    """
+    base_tokens = count_tokens(build_validation_prompt({}))
+    max_facts = max(max_output_tokens // max(output_tokens_per_fact, 1), 1)
+
+    batches = []
+    current, current_tokens = {}, base_tokens
+    for fact, evidence_list in facts_evidence_dict.items():
+        fact_tokens = count_tokens(build_validation_prompt({fact: evidence_list})) - base_tokens
+        if current and (current_tokens + fact_tokens > max_prompt_tokens or len(current) >= max_facts):
+            batches.append(current)
+            current, current_tokens = {}, base_tokens
+        current[fact] = evidence_list
+        current_tokens += fact_tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _failed_batch(facts_evidence_dict, error):
+    print(f"Error during validation sub-batch: {error}")
+    return {
+        fact: {"verdict": "Error", "reasoning": f"LLM call failed: {error}", "supporting_urls": []}
+        for fact in facts_evidence_dict
+    }
+
+
+def _response_text(response):
+    return response.content.strip() if hasattr(response, "content") else str(response)
+
+
+def _llm_call_key(llm, prompt):
+    # Identifies an LLM call for record/replay
+    return [getattr(llm, "deployment_name", None), prompt]
+
+
+def _validate_one_batch(llm, facts_evidence_dict):
+    prompt = build_validation_prompt(facts_evidence_dict)
+
+    # ----- Invoke LLM -----
+    try:
+        msg = cassette.call("validate", _llm_call_key(llm, prompt), lambda: _response_text(llm.invoke(prompt)))
+    except Exception as e:
+        return _failed_batch(facts_evidence_dict, e)
+
+    return parse_validation_response(facts_evidence_dict, msg)
+
+
+async def _validate_one_batch_async(llm, facts_evidence_dict):
+    prompt = build_validation_prompt(facts_evidence_dict)
+
+    # ----- Invoke LLM -----
+    async def _ainvoke():
+        return _response_text(await llm.ainvoke(prompt))
+
+    try:
+        msg = await cassette.call_async("validate", _llm_call_key(llm, prompt), _ainvoke)
+    except Exception as e:
+        return _failed_batch(facts_evidence_dict, e)
+
+    return parse_validation_response(facts_evidence_dict, msg)
+
+
+def _failed_facts(facts_evidence_dict, results):
+    # The prompt only allows Supported/Refuted/Cannot Conclude, so "Error" always comes from our side
+    return {
+        fact: evidence_list
+        for fact, evidence_list in facts_evidence_dict.items()
+        if results.get(fact, {}).get("verdict") == "Error"
+    }
+
+
+def _retry_batches(pending, attempted, calls_left):
+    # If the whole previous call failed (e.g. unparseable JSON), halve it so the retry is smaller,
+    # provided the retry budget still covers two calls
+    items = list(pending.items())
+    if calls_left > 1 and len(items) > 1 and len(items) == len(attempted):
+        mid = len(items) // 2
+        return [dict(items[:mid]), dict(items[mid:])]
+    return [pending]
+
+
+def _validate_with_retries(llm, facts_evidence_dict, max_retries):
+    results = _validate_one_batch(llm, facts_evidence_dict)
+    attempted = facts_evidence_dict
+    calls_left = max_retries  # charged once per follow-up LLM call
+    while calls_left > 0:
+        pending = _failed_facts(attempted, results)
+        if not pending:
+            break
+        batches = _retry_batches(pending, attempted, calls_left)
+        calls_left -= len(batches)
+        print(f"Re-validating {len(pending)} of {len(attempted)} facts "
+              f"({max_retries - calls_left}/{max_retries} retry calls used)")
+        for batch in batches:
+            results.update(_validate_one_batch(llm, batch))
+        attempted = pending
+    return results
+
+
+async def _validate_with_retries_async(llm, facts_evidence_dict, max_retries):
+    results = await _validate_one_batch_async(llm, facts_evidence_dict)
+    attempted = facts_evidence_dict
+    calls_left = max_retries  # charged once per follow-up LLM call
+    while calls_left > 0:
+        pending = _failed_facts(attempted, results)
+        if not pending:
+            break
+        batches = _retry_batches(pending, attempted, calls_left)
+        calls_left -= len(batches)
+        print(f"Re-validating {len(pending)} of {len(attempted)} facts "
+              f"({max_retries - calls_left}/{max_retries} retry calls used)")
+        retried = await asyncio.gather(*(_validate_one_batch_async(llm, batch) for batch in batches))
+        for batch_results in retried:
+            results.update(batch_results)
+        attempted = pending
+    return results
+
+
+def _merge_batches(facts_evidence_dict, batch_results):
+    # Restore the caller's fact order
+    merged = {}
+    for results in batch_results:
+        merged.update(results)
+    return {fact: merged[fact] for fact in facts_evidence_dict if fact in merged}
+
+
+def validate_facts_batch(
+    facts_evidence_dict,
+    azure_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+    deployment_name="o4-mini",
+    api_version="2024-12-01-preview",
+    max_prompt_tokens=MAX_PROMPT_TOKENS,
+    max_output_tokens=MAX_OUTPUT_TOKENS,
+    max_retries=MAX_RETRIES
+):
+    """
+    Batch fact-checking using Azure OpenAI.
+    Facts with a cached verdict for the same evidence, deployment (or set_llm model) and prompt version are not sent to the LLM,
+    nor (with SEMANTIC_CACHE=1) paraphrases of facts already validated.
+    The rest are split into token-budgeted sub-batches which are validated concurrently;
+    facts the LLM drops or fails on are re-submitted on their own, in at most max_retries follow-up calls per sub-batch.
+    Returns a dict mapping each fact to its verdict, reasoning, and supporting URLs.
+    """
+
+    cache_model = _cache_model(deployment_name)
+    cached, uncached, keys = _lookup_verdicts(facts_evidence_dict, cache_model)
+    results = {}
+    if uncached:
+        llm = get_llm(azure_api_key, azure_endpoint, deployment_name, api_version)
+        results = _validate_uncached(llm, uncached, max_prompt_tokens, max_output_tokens, max_retries)
+        _store_verdicts(results, keys, cache_model)
+    return _merge_batches(facts_evidence_dict, [cached, results])
+
+
+def _validate_uncached(llm, facts_evidence_dict, max_prompt_tokens, max_output_tokens, max_retries):
+    batches = split_facts_evidence(facts_evidence_dict, max_prompt_tokens, max_output_tokens)
+
+    if len(batches) <= 1:
+        return _validate_with_retries(llm, facts_evidence_dict, max_retries)
+
+    with ThreadPoolExecutor(max_workers=min(len(batches), MAX_BATCH_CONCURRENCY)) as pool:
+        batch_results = list(pool.map(lambda batch: _validate_with_retries(llm, batch, max_retries), batches))
+    return _merge_batches(facts_evidence_dict, batch_results)
+
+
+async def validate_facts_batch_async(
+    facts_evidence_dict,
+    azure_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+    deployment_name="o4-mini",
+    api_version="2024-12-01-preview",
+    max_prompt_tokens=MAX_PROMPT_TOKENS,
+    max_output_tokens=MAX_OUTPUT_TOKENS,
+    max_retries=MAX_RETRIES
+):
+    """
+    Asyncio variant of validate_facts_batch built on ainvoke.
+    Lets many QA pairs be validated concurrently on one event loop.
+    """
+
+    cache_model = _cache_model(deployment_name)
+    cached, uncached, keys = _lookup_verdicts(facts_evidence_dict, cache_model)
+    results = {}
+    if uncached:
+        llm = get_llm(azure_api_key, azure_endpoint, deployment_name, api_version)
+        results = await _validate_uncached_async(llm, uncached, max_prompt_tokens, max_output_tokens, max_retries)
+        _store_verdicts(results, keys, cache_model)
+    return _merge_batches(facts_evidence_dict, [cached, results])
+
+
+async def _validate_uncached_async(llm, facts_evidence_dict, max_prompt_tokens, max_output_tokens, max_retries):
+    batches = split_facts_evidence(facts_evidence_dict, max_prompt_tokens, max_output_tokens)
+
+    if len(batches) <= 1:
+        return await _validate_with_retries_async(llm, facts_evidence_dict, max_retries)
+
+    semaphore = asyncio.Semaphore(MAX_BATCH_CONCURRENCY)
+
+    async def _bounded(batch):
+        async with semaphore:
+            return await _validate_with_retries_async(llm, batch, max_retries)
+
+    batch_results = await asyncio.gather(*(_bounded(batch) for batch in batches))
+    return _merge_batches(facts_evidence_dict, batch_results)
+
+
 # ---- EXAMPLE USAGE ----
 if __name__ == "__main__":
     facts_evidence_dict = {